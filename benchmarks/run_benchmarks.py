@@ -0,0 +1,467 @@
+"""This script measures the performance of the engine's hot paths so
+that regressions can be detected between revisions.
+
+All benchmarks run headless using SDL's dummy video driver, so no
+window is ever opened. Results are written as JSON, and a previous
+results file can be passed in to flag any benchmark that has slowed
+down past a given threshold.
+
+Usage:
+    python run_benchmarks.py --output results.json
+    python run_benchmarks.py --compare results.json --threshold 0.1
+"""
+from __future__ import print_function
+import argparse
+import json
+import os
+import sys
+import timeit
+
+# The dummy driver must be selected before PyGame initializes video.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from pygame.surface import Surface
+from pygame.color import Color
+
+# The engine's modules are imported relative to the root directory.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir))
+from factory import EntityTemplate
+from materials.game_objects import Entity, Component, ComponentIndex
+from materials.graphics import (Graphic, Animation, Axis,
+                                order_flipped_sprite_sheet)
+from materials.snapshots import WorldSnapshot
+
+
+FRAME_SIZE = 32
+DEFAULT_COMPONENT_COUNTS = (1, 10, 50)
+DEFAULT_FRAME_COUNTS = (4, 16, 64)
+DEFAULT_ENTITY_COUNTS = (1000, 10000, 100000)
+DEFAULT_SNAPSHOT_COUNTS = (1000, 10000)
+DEFAULT_SPAWN_COUNTS = (100, 1000)
+# The width and height of the sprite sheets used when spawning. The
+# larger one is typical of a game's characters, where converting the
+# image dominates the cost of constructing a Graphic.
+SPAWN_SHEET_SIZES = ((8 * 4, 8), (64 * 4, 64))
+DEFAULT_QUERY_COUNTS = (1000, 10000)
+
+
+class TimedComponent(Component):
+    """A Component with a trivial update() that takes the time
+    argument.
+    """
+    def update(self, time):
+        pass
+
+    def receive_message(self, message_type, *details):
+        pass
+
+
+class UntimedComponent(Component):
+    """A Component with a trivial update() that omits the time
+    argument.
+    """
+    def update(self):
+        pass
+
+    def receive_message(self, message_type, *details):
+        pass
+
+
+def create_test_surface(width, height):
+    """Return a Surface filled with an opaque color and a magenta
+    square, so that colorkeying has real work to do.
+
+    Args:
+        width (int): The width of the Surface in pixels.
+        height (int): The height of the Surface in pixels.
+    """
+    surf = Surface((width, height))
+    surf.fill(Color('steelblue'))
+    surf.fill(Color('magenta'), (0, 0, width // 2, height // 2))
+    return surf
+
+
+def create_sprite_sheet(num_of_frames):
+    """Return a sprite sheet Surface with the given number of frames.
+
+    Args:
+        num_of_frames (int): How many FRAME_SIZE-wide frames the
+            sheet will contain.
+    """
+    return create_test_surface(FRAME_SIZE * num_of_frames, FRAME_SIZE)
+
+
+def bench_entity_update(component_counts):
+    """Yield benchmarks for Entity.update() with a mix of timed and
+    untimed Components.
+    """
+    for count in component_counts:
+        components = []
+        for i in range(count):
+            if i % 2 == 0:
+                components.append(TimedComponent())
+            else:
+                components.append(UntimedComponent())
+        entity = Entity(0, 0, *components)
+        yield ('entity_update[components=%d]' % count,
+               lambda entity=entity: entity.update(0.016))
+
+
+def bench_send_message(component_counts):
+    """Yield benchmarks for Entity.send_message() fanning out to
+    every Component.
+    """
+    for count in component_counts:
+        entity = Entity(0, 0, *[TimedComponent() for _ in range(count)])
+        yield ('send_message[components=%d]' % count,
+               lambda entity=entity: entity.send_message(1, 10, 20))
+
+
+def bench_graphic_transforms():
+    """Yield benchmarks for the Graphic image transformations."""
+    graphic = Graphic(create_test_surface(FRAME_SIZE, FRAME_SIZE))
+    Entity(0, 0, graphic)
+
+    def magnify():
+        graphic.magnify(2)
+        graphic.resize(FRAME_SIZE, FRAME_SIZE)
+
+    yield ('graphic_flip[horizontal]',
+           lambda: graphic.flip(Axis.horizontal))
+    yield ('graphic_flip[both]',
+           lambda: graphic.flip(Axis.horizontal | Axis.vertical))
+    yield ('graphic_magnify_and_restore', magnify)
+    yield ('graphic_resize',
+           lambda: graphic.resize(FRAME_SIZE, FRAME_SIZE))
+
+
+def bench_order_flipped_sprite_sheet(frame_counts):
+    """Yield benchmarks for re-ordering flipped sprite sheets of
+    varying lengths.
+    """
+    for count in frame_counts:
+        sheet = create_sprite_sheet(count)
+        yield ('order_flipped_sprite_sheet[frames=%d]' % count,
+               lambda sheet=sheet: order_flipped_sprite_sheet(sheet,
+                                                              FRAME_SIZE))
+
+
+def bench_animation_blit(frame_counts):
+    """Yield benchmarks for stamping a Surface onto every frame of an
+    Animation.
+    """
+    decal = create_test_surface(FRAME_SIZE // 4, FRAME_SIZE // 4)
+    for count in frame_counts:
+        animation = Animation(create_sprite_sheet(count), 0, 0,
+                              *([1] * count))
+        Entity(0, 0, animation)
+        yield ('animation_blit[frames=%d]' % count,
+               lambda animation=animation: animation.blit(decal, (2, 2)))
+
+
+def bench_draw_loop(entity_counts):
+    """Yield benchmarks for a full update-and-draw pass over many
+    Entities containing Animations.
+    """
+    screen = pygame.display.get_surface()
+    # A small sheet keeps memory use reasonable at high entity counts,
+    # since every Animation holds its own copy of the image.
+    sheet = create_test_surface(8 * 4, 8)
+    for count in entity_counts:
+        entities = []
+        for i in range(count):
+            animation = Animation(sheet, 0, 0, 1, 2, 3, 4)
+            entities.append(Entity(i % 640, i % 480, animation))
+
+        def draw_loop(entities=entities):
+            for entity in entities:
+                entity.update(0.016)
+                entity.graphic.draw(screen)
+
+        yield ('draw_loop[entities=%d]' % count, draw_loop)
+
+
+def bench_rotated_draw_loop(entity_counts):
+    """Yield benchmarks for spinning and drawing many Entities whose
+    Graphics share the same source image.
+    """
+    screen = pygame.display.get_surface()
+    source = create_test_surface(8, 8)
+    for count in entity_counts:
+        entities = [Entity(i % 640, i % 480, Graphic(source))
+                    for i in range(count)]
+
+        def rotated_draw_loop(entities=entities):
+            for entity in entities:
+                entity.graphic.rotate(5)
+                entity.graphic.draw(screen)
+
+        # Every rotation bucket is rendered once before timing, so that
+        # only the cached blits are measured.
+        for _ in range(72):
+            rotated_draw_loop(entities[:1])
+        yield ('rotated_draw_loop[entities=%d]' % count, rotated_draw_loop)
+
+
+def bench_spawning(spawn_counts):
+    """Yield benchmarks comparing Entities built with their constructor
+    against Entities spawned from an EntityTemplate.
+    """
+    for width, height in SPAWN_SHEET_SIZES:
+        sheet = create_test_surface(width, height)
+        template = EntityTemplate(Animation(sheet, 0, 0, 1, 2, 3, 4),
+                                  TimedComponent())
+        for count in spawn_counts:
+            positions = [(i, i) for i in range(count)]
+
+            def construct(positions=positions, sheet=sheet):
+                return [Entity(x, y, Animation(sheet, 0, 0, 1, 2, 3, 4),
+                               TimedComponent())
+                        for x, y in positions]
+
+            suffix = '[entities=%d,sheet=%dx%d]' % (count, width, height)
+            yield ('construct_entities' + suffix, construct)
+            yield ('spawn_many' + suffix,
+                   lambda positions=positions, template=template:
+                       template.spawn_many(positions))
+
+
+def naive_snapshot(entities):
+    """Return a list with a tuple of the same state that a
+    WorldSnapshot saves for each Entity containing an Animation.
+
+    This is the simplest way of saving the state, which WorldSnapshot
+    is measured against.
+    """
+    return [(entity.x, entity.y, entity.graphic._rect.x,
+             entity.graphic._rect.y, entity.graphic._image.get_alpha(),
+             entity.graphic._angle, entity.graphic._frame_index,
+             entity.graphic._frame_counter, entity.graphic._is_paused,
+             entity.graphic._is_playing_backwards,
+             entity.graphic._held_frame)
+            for entity in entities]
+
+
+def bench_snapshots(entity_counts):
+    """Yield benchmarks for saving, restoring and diffing the state of
+    many Entities containing Animations, along with a naive save for
+    comparison.
+    """
+    sheet = create_test_surface(8 * 4, 8)
+    for count in entity_counts:
+        entities = [Entity(i, i, Animation(sheet, 0, 0, 1, 2, 3, 4))
+                    for i in range(count)]
+        snapshot = WorldSnapshot(entities)
+        base = snapshot.save()
+        for entity in entities[::10]:
+            entity.move(1, 1)
+        target = snapshot.save()
+        buffer = snapshot.create_buffer()
+        diff = snapshot.diff(base, target)
+
+        yield ('snapshot_naive_save[entities=%d]' % count,
+               lambda entities=entities: naive_snapshot(entities))
+        yield ('snapshot_save[entities=%d]' % count,
+               lambda snapshot=snapshot, buffer=buffer:
+                   snapshot.save(buffer))
+        yield ('snapshot_restore[entities=%d]' % count,
+               lambda snapshot=snapshot, buffer=target:
+                   snapshot.restore(buffer))
+        yield ('snapshot_diff[entities=%d]' % count,
+               lambda snapshot=snapshot, base=base, target=target:
+                   snapshot.diff(base, target))
+        yield ('snapshot_apply_diff[entities=%d]' % count,
+               lambda snapshot=snapshot, buffer=buffer, diff=diff:
+                   snapshot.apply_diff(buffer, diff))
+
+
+def bench_component_query(query_counts):
+    """Yield benchmarks comparing ComponentIndex queries against
+    scanning every Entity for a Component attribute.
+
+    A tenth of the Entities contain the queried Component.
+    """
+    for count in query_counts:
+        entities = []
+        for i in range(count):
+            if i % 10 == 0:
+                entities.append(Entity(i, i, TimedComponent(),
+                                       UntimedComponent()))
+            else:
+                entities.append(Entity(i, i, UntimedComponent()))
+        index = ComponentIndex(*entities)
+        changing_entity = entities[1]
+        component = TimedComponent()
+
+        def hasattr_scan(entities=entities):
+            return [entity for entity in entities
+                    if hasattr(entity, 'timedcomponent')]
+
+        # The changing Entity matches the query half of the time, so
+        # the cached result is thrown away before every query.
+        def query_after_change(index=index, entity=changing_entity,
+                               component=component):
+            if component.entity is None:
+                entity.add_component(component)
+            else:
+                entity.remove_component(component)
+            return list(index.query(TimedComponent))
+
+        yield ('component_query_hasattr_scan[entities=%d]' % count,
+               hasattr_scan)
+        yield ('component_query[entities=%d]' % count,
+               lambda index=index: list(index.query(TimedComponent)))
+        yield ('component_query_after_change[entities=%d]' % count,
+               query_after_change)
+
+
+def collect_benchmarks(args):
+    """Return a list of (name, callable) pairs for every benchmark
+    selected by the command-line arguments.
+    """
+    benchmarks = []
+    benchmarks.extend(bench_entity_update(args.component_counts))
+    benchmarks.extend(bench_send_message(args.component_counts))
+    benchmarks.extend(bench_graphic_transforms())
+    benchmarks.extend(bench_order_flipped_sprite_sheet(args.frame_counts))
+    benchmarks.extend(bench_animation_blit(args.frame_counts))
+    benchmarks.extend(bench_draw_loop(args.entity_counts))
+    benchmarks.extend(bench_rotated_draw_loop(args.entity_counts))
+    benchmarks.extend(bench_snapshots(args.snapshot_counts))
+    benchmarks.extend(bench_spawning(args.spawn_counts))
+    benchmarks.extend(bench_component_query(args.query_counts))
+    if args.filter:
+        benchmarks = [(name, func) for name, func in benchmarks
+                      if args.filter in name]
+    return benchmarks
+
+
+def time_benchmark(func, min_duration, repeat):
+    """Return the best time, in seconds, taken by a single call to a
+    benchmark function, along with the number of calls made per run.
+
+    The number of calls per timing run is scaled up until a run lasts
+    at least min_duration seconds, so that very fast operations are
+    still measured accurately.
+
+    Args:
+        func (callable): The benchmark to time.
+        min_duration (float): The minimum length of a timing run.
+        repeat (int): How many timing runs to perform. The fastest
+            run is reported, as it is the least affected by noise.
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_duration or number >= 10 ** 6:
+            break
+        number *= 10
+    best = min(timer.repeat(repeat, number))
+    return best / number, number
+
+
+def run_benchmarks(benchmarks, min_duration, repeat):
+    """Run each benchmark and return a dict mapping benchmark names to
+    their results.
+    """
+    results = {}
+    for name, func in benchmarks:
+        seconds, number = time_benchmark(func, min_duration, repeat)
+        results[name] = {'seconds_per_call': seconds, 'calls': number}
+        print('%-45s %12.3f us' % (name, seconds * 1e6))
+    return results
+
+
+def compare_results(baseline, current, threshold):
+    """Return a list of (name, baseline seconds, current seconds)
+    tuples for every benchmark that slowed down by more than the
+    threshold.
+
+    Args:
+        baseline (dict): Results from a previous run.
+        current (dict): Results from this run.
+        threshold (float): The allowed fractional slowdown. For
+            example, 0.1 permits benchmarks to be up to 10% slower.
+    """
+    regressions = []
+    for name in sorted(current):
+        if name not in baseline:
+            continue
+        old = baseline[name]['seconds_per_call']
+        new = current[name]['seconds_per_call']
+        if old > 0 and (new - old) / old > threshold:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def parse_counts(text):
+    """Convert a comma-separated string into a tuple of ints."""
+    return tuple(int(value) for value in text.split(','))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Benchmark the hot paths of the GameHappy engine.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    parser.add_argument('--compare',
+                        help='A previous JSON results file to compare '
+                             'against.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Fractional slowdown that counts as a '
+                             'regression. (Default: 0.1)')
+    parser.add_argument('--filter',
+                        help='Only run benchmarks whose names contain '
+                             'this string.')
+    parser.add_argument('--component-counts', type=parse_counts,
+                        default=DEFAULT_COMPONENT_COUNTS)
+    parser.add_argument('--frame-counts', type=parse_counts,
+                        default=DEFAULT_FRAME_COUNTS)
+    parser.add_argument('--entity-counts', type=parse_counts,
+                        default=DEFAULT_ENTITY_COUNTS)
+    parser.add_argument('--snapshot-counts', type=parse_counts,
+                        default=DEFAULT_SNAPSHOT_COUNTS)
+    parser.add_argument('--spawn-counts', type=parse_counts,
+                        default=DEFAULT_SPAWN_COUNTS)
+    parser.add_argument('--query-counts', type=parse_counts,
+                        default=DEFAULT_QUERY_COUNTS)
+    parser.add_argument('--min-duration', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=3)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    pygame.display.init()
+    # Surface.convert() requires a display mode to have been set.
+    pygame.display.set_mode((640, 480))
+
+    results = run_benchmarks(collect_benchmarks(args), args.min_duration,
+                             args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'pygame_version': pygame.version.ver,
+                       'python_version': sys.version.split()[0],
+                       'results': results},
+                      output_file, indent=2, sort_keys=True)
+
+    pygame.quit()
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare_results(baseline, results, args.threshold)
+        for name, old, new in regressions:
+            print('REGRESSION: %s went from %.3f us to %.3f us (+%.1f%%)'
+                  % (name, old * 1e6, new * 1e6, (new - old) / old * 100))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,497 @@
+"""This script quickly exercises the engine's performance features from
+end to end, to catch breakages that the benchmarks would only reveal
+by crashing.
+
+Each check prints whether it passed, and the script exits with a
+non-zero status if any of them failed.
+
+Usage:
+    python smoke_test.py
+"""
+from __future__ import print_function
+import gc
+import sys
+import time
+import traceback
+from enum import IntEnum
+
+# Importing the benchmark script selects the dummy video driver and
+# puts the engine's root directory on the path, so it comes first.
+from run_benchmarks import create_test_surface
+import pygame
+from pygame.surface import Surface
+from factory import EntityTemplate
+from materials.game_objects import Entity, Component, ComponentIndex
+from materials import graphics
+from materials.graphics import (Graphic, Animation, Axis, HeadlessImage,
+                                set_headless_mode)
+from materials.snapshots import WorldSnapshot
+from sharding import ShardedWorld
+from streaming import ChunkStreamer
+
+
+class SmokeMessage(IntEnum):
+    """The message types sent to Entities within shards."""
+    set_y = 0
+
+
+class Walker(Component):
+    """Moves its Entity one pixel to the right every update, and moves
+    it vertically when told to.
+    """
+    def update(self, time):
+        self.entity.x += 1
+
+    def receive_message(self, message_type, details):
+        # Entity.send_message() passes the details as a single tuple.
+        if message_type == SmokeMessage.set_y:
+            self.entity.y = sum(details)
+
+
+class Counter(Component):
+    """Counts its updates, without taking the time argument."""
+    def __init__(self):
+        super(Counter, self).__init__()
+        self.count = 0
+
+    def update(self):
+        self.count += 1
+
+
+class BusyWalker(Walker):
+    """A Walker that also spends some time on every update, so that
+    its room has a measurable cost.
+    """
+    def update(self, time):
+        super(BusyWalker, self).update(time)
+        for _ in range(20000):
+            pass
+
+
+class Faulty(Component):
+    """Raises an error once its Entity has moved a few pixels."""
+    def update(self, time):
+        if self.entity.x > 3:
+            raise ValueError('Faulty Component')
+
+
+class Health(Component):
+    """Adds itself to Entities under a custom attribute name, using the
+    _add_self_as_attribute() hook.
+    """
+    def _add_self_as_attribute(self, entity):
+        entity.hp = self
+
+
+def create_room():
+    """Return the Entities of a small room for a shard."""
+    return [Entity(index * 10, 0, Walker()) for index in range(3)]
+
+
+def create_busy_room():
+    """Return the Entities of a room that takes a while to update."""
+    return [Entity(index * 10, 0, BusyWalker()) for index in range(3)]
+
+
+def create_faulty_room():
+    """Return the Entities of a room that fails after a few ticks."""
+    return [Entity(0, 0, Walker(), Faulty())]
+
+
+def expect(condition, description):
+    """Raise an AssertionError with a description if a condition is
+    False.
+    """
+    if not condition:
+        raise AssertionError(description)
+
+
+def wait_until(condition, timeout=5.0):
+    """Return a Boolean indicating whether a function returned True
+    before a number of seconds passed.
+    """
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def smoke_entity_update():
+    """Components are updated with or without the time argument."""
+    counter = Counter()
+    entity = Entity(0, 0, Walker(), counter)
+    entity.update(0.016)
+    expect(entity.x == 1, 'Timed Component was not updated.')
+    expect(counter.count == 1, 'Untimed Component was not updated.')
+
+
+def smoke_sharding():
+    """Rooms are simulated in worker processes, receive messages, and
+    keep their positions when moved or removed.
+    """
+    world = ShardedWorld(2, tick_rate=30)
+    world.start()
+    try:
+        world.add_room('room', create_room, 3)
+        expect(wait_until(lambda: len(world.room_positions('room')) == 3 and
+                          world.room_positions('room')[0][0] > 0),
+               'Room positions were never shared.')
+
+        world.send_message('room', 1, SmokeMessage.set_y, 5, 7)
+        expect(wait_until(lambda: world.room_positions('room')[1][1] == 12),
+               'Message was not delivered.')
+        final_positions = world.remove_room('room')
+        expect(len(final_positions) == 3 and final_positions[1][1] == 12,
+               'Removed room did not return its final positions.')
+
+        for index in range(4):
+            world.add_room(index, create_busy_room, 3)
+        # Leave every room on the shard with the most rooms, so that
+        # there is something to rebalance.
+        busiest = max(range(2), key=lambda shard_index:
+                      len(world.room_ids(shard_index)))
+        for room_id in world.room_ids(1 - busiest):
+            world.remove_room(room_id)
+        remaining = world.room_ids(busiest)
+        expect(wait_until(lambda: all(world.room_positions(room_id) and
+                                      world.room_positions(room_id)[0][0] > 1
+                                      for room_id in remaining)),
+               'Busy rooms were never updated.')
+
+        previous_x = dict((room_id, world.room_positions(room_id)[0][0])
+                          for room_id in remaining)
+        moves = world.rebalance()
+        expect(moves == len(remaining) // 2,
+               'Rebalancing moved %d of %d rooms.' % (moves, len(remaining)))
+        expect(len(world.room_ids(1 - busiest)) == moves,
+               'Moved rooms are not on the idle shard.')
+        for room_id in remaining:
+            expect(wait_until(lambda: world.room_positions(room_id) and
+                              world.room_positions(room_id)[0][0] >=
+                              previous_x[room_id]),
+                   'Room %r lost its positions when moved.' % (room_id,))
+    finally:
+        world.stop()
+
+
+def smoke_sharding_errors():
+    """A room that raises an error stops without taking down the rest
+    of its shard.
+    """
+    world = ShardedWorld(1, tick_rate=30)
+    world.start()
+    try:
+        world.add_room('faulty', create_faulty_room, 1)
+        world.add_room('room', create_room, 3)
+        expect(wait_until(lambda: 'faulty' in world.room_errors()),
+               'The room\'s error was never reported.')
+        expect('Faulty Component' in world.room_errors()['faulty'],
+               'The reported traceback does not describe the error.')
+        expect(world.shard_is_alive(0), 'The shard stopped with the room.')
+
+        previous_x = world.room_positions('room')[0][0]
+        expect(wait_until(lambda: world.room_positions('room')[0][0] >
+                          previous_x),
+               'The other room stopped being updated.')
+        expect(world.remove_room('faulty') == [(4, 0)],
+               'The failed room did not keep its last positions.')
+        expect(world.room_ids() == ['room'],
+               'The failed room was not removed.')
+    finally:
+        world.stop()
+    expect(not world.shard_is_alive(0), 'The shard is still running.')
+
+
+def smoke_headless_mode():
+    """Headless Graphics track their geometry without any pixel data.
+    """
+    set_headless_mode()
+    try:
+        animation = Animation(create_test_surface(64, 16), 0, 0, 1, 1, 1, 1)
+    finally:
+        set_headless_mode(False)
+    Entity(10, 20, animation)
+    expect(animation.is_headless(), 'Headless mode was ignored.')
+    expect(animation.memory_size() == 0, 'A headless image has pixels.')
+
+    animation.magnify(2)
+    animation.flip(Axis.horizontal)
+    animation.opacify(-55)
+    animation.update()
+    expect(animation.draw_rect() == pygame.Rect(10, 20, 32, 32),
+           'Magnifying did not resize the headless Animation.')
+    expect(animation._get_alpha() == 200,
+           'Opacifying did not change the headless alpha.')
+    expect(animation.collision_mask() is None,
+           'A headless Animation has a collision mask.')
+
+    destination = Surface((64, 64))
+    expect(animation.draw(destination) == pygame.Rect(10, 20, 32, 32),
+           'Drawing a headless Animation reported the wrong region.')
+    expect(destination.get_at((20, 30)) == pygame.Color(0, 0, 0),
+           'Drawing a headless Animation changed the destination.')
+    headless = Graphic(HeadlessImage(8, 8))
+    expect(headless.is_headless() and headless.memory_size() == 0,
+           'A HeadlessImage source did not create a headless Graphic.')
+
+
+def smoke_animation_blit():
+    """Blitting onto an Animation draws onto every frame, without
+    spilling into the neighbouring frames.
+    """
+    animation = Animation(create_test_surface(64, 16), 0, 0, 1, 1, 1, 1)
+    Entity(0, 0, animation)
+    drawn_region = animation.blit(Surface((8, 8)), (12, 12))
+    expect(drawn_region == pygame.Rect(12, 12, 4, 4),
+           'The blit was not clipped to a single frame.')
+    for frame_index in range(animation.num_of_frames()):
+        frame_x = frame_index * 16
+        expect(animation._image.get_at((frame_x + 12, 12)) ==
+               pygame.Color(0, 0, 0),
+               'Frame %d was not blitted onto.' % frame_index)
+        if frame_index < animation.num_of_frames() - 1:
+            expect(animation._image.get_at((frame_x + 16, 12)) !=
+                   pygame.Color(0, 0, 0),
+                   'The blit spilled over from frame %d.' % frame_index)
+
+
+def smoke_component_index():
+    """Cached query results are updated when Components are added or
+    removed, and when Entities are killed.
+    """
+    walker = Walker()
+    walking = Entity(0, 0, walker)
+    counting = Entity(0, 0, Counter())
+    index = ComponentIndex(walking, counting)
+    expect(list(index.query(Walker)) == [walking],
+           'The query found the wrong Entities.')
+
+    counting.add_component(Walker())
+    expect(set(index.query(Walker)) == set([walking, counting]),
+           'Adding a Component did not update the query.')
+    walking.remove_component(walker)
+    expect(list(index.query(Walker)) == [counting],
+           'Removing a Component did not update the query.')
+    expect(not hasattr(walking, 'walker'),
+           'Removing a Component left its attribute behind.')
+    counting.kill()
+    expect(list(index.query(Walker)) == [] and len(index) == 1,
+           'Killing an Entity did not remove it from the index.')
+
+    health = Health()
+    entity = Entity(0, 0, health)
+    expect(entity.hp is health, 'The binding hook was not used.')
+    entity.remove_component(health)
+    expect(not hasattr(entity, 'hp'),
+           'Removing a Component did not undo its binding hook.')
+
+
+def smoke_collision_masks():
+    """Masks are shared between Graphics of the same source, and
+    transparent pixels never collide.
+    """
+    source = create_test_surface(16, 16)
+    graphic = Graphic(source)
+    other = Graphic(source)
+    far_away = Graphic(source)
+    Entity(0, 0, graphic)
+    other_entity = Entity(4, 4, other)
+    Entity(100, 100, far_away)
+
+    expect(graphic.collision_mask() is other.collision_mask(),
+           'Graphics of the same source do not share their mask.')
+    expect(graphic.collide_all([other, far_away]) == [other],
+           'Overlapping opaque pixels were not detected.')
+
+    # Only the other Graphic's transparent quarter overlaps the opaque
+    # pixels, until it is flipped.
+    other_entity.set_position(8, 8)
+    expect(not graphic.collides_with(other),
+           'Transparent pixels were detected as colliding.')
+    other.flip(Axis.horizontal | Axis.vertical)
+    expect(graphic.collides_with(other),
+           'Flipping did not update the collision mask.')
+
+    # The shared masks are only kept while the source image is in use.
+    num_of_sources = len(graphics._mask_cache)
+    del source
+    gc.collect()
+    expect(len(graphics._mask_cache) == num_of_sources - 1,
+           'The masks outlived their source image.')
+    expect(graphic.collides_with(other),
+           'Masks stopped working once the source image was freed.')
+
+
+def smoke_snapshots():
+    """Saving and restoring returns Entities to their earlier state,
+    including flipped and magnified Graphics.
+    """
+    graphic = Graphic(create_test_surface(16, 16))
+    animation = Animation(create_test_surface(64, 16), 0, 0, 2, 2, 2, 2)
+    entities = [Entity(0, 0, graphic), Entity(5, 5, animation)]
+    graphic.flip(Axis.horizontal)
+    graphic.set_rotation(30)
+    animation.magnify(2)
+    animation.hold_frame(2)
+    animation.update()
+    animation.update()
+
+    snapshot = WorldSnapshot(entities)
+    saved = snapshot.save()
+    entities[0].set_position(50, 50)
+    graphic.opacify(-100)
+    graphic.set_rotation(45)
+    animation.pause()
+    animation.update()
+    changed = snapshot.save()
+    diff = snapshot.diff(saved, changed)
+    expect(len(diff[0]) > 0, 'The diff between different states is empty.')
+
+    snapshot.restore(saved)
+    expect((entities[0].x, entities[0].y) == (0, 0),
+           'Entity position was not restored.')
+    expect(graphic._get_alpha() == 255, 'Graphic alpha was not restored.')
+    expect(graphic.get_rotation() == 30, 'Rotation was not restored.')
+    expect(snapshot.save() == saved, 'Restored state differs from saved.')
+
+    snapshot.apply_diff(saved, diff)
+    expect(saved == changed, 'Applying the diff did not reproduce it.')
+
+
+def smoke_rotation():
+    """Rotated images are shared between Graphics, and headless
+    Graphics report the same rotated size as rendered ones.
+    """
+    for width, height in ((30, 10), (17, 5), (8, 8)):
+        for angle in range(0, 360, 5):
+            rendered = Graphic(Surface((width, height)))
+            headless = Graphic(HeadlessImage(width, height))
+            Entity(0, 0, rendered)
+            Entity(0, 0, headless)
+            rendered.set_rotation_buckets(72)
+            headless.set_rotation_buckets(72)
+            rendered.set_rotation(angle)
+            headless.set_rotation(angle)
+            expect(rendered.draw_rect().size == headless.draw_rect().size,
+                   'Headless %dx%d image at %d degrees is %r, not %r.'
+                   % (width, height, angle, headless.draw_rect().size,
+                      rendered.draw_rect().size))
+
+    source = create_test_surface(16, 16)
+    graphic = Graphic(source)
+    other = Graphic(source)
+    for rotated in (graphic, other):
+        Entity(0, 0, rotated)
+        rotated.rotate(-30)
+    expect(graphic._rotated_frame() is other._rotated_frame(),
+           'Graphics of the same source do not share rotated images.')
+    expect(graphic.get_rotation() == 330,
+           'Negative rotations were not wrapped around.')
+
+    try:
+        graphic.set_rotation_buckets(0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('A rotation bucket count of 0 was accepted.')
+
+
+def smoke_streaming():
+    """Chunks are loaded on background threads around the camera and
+    released once it moves away. A chunk that fails to load is only
+    attempted once while it stays in range.
+    """
+    load_counts = {}
+
+    def load_chunk(column, row):
+        load_counts[column, row] = load_counts.get((column, row), 0) + 1
+        time.sleep(0.001)
+        if (column, row) == (1, 1):
+            raise IOError('Missing chunk file')
+        return [(column * 64 + offset, row * 64) for offset in (8, 16)]
+
+    def create_entity(item):
+        return Entity(item[0], item[1], Graphic(HeadlessImage(8, 8)))
+
+    streamer = ChunkStreamer(64, load_chunk, create_entity, load_radius=1,
+                             unload_radius=1, num_of_threads=2)
+    try:
+        def all_loaded():
+            streamer.update(32, 32)
+            metrics = streamer.metrics()
+            return metrics['resident_chunks'] + metrics['failed_chunks'] == 9
+
+        expect(wait_until(all_loaded), 'Nearby chunks never loaded.')
+        metrics = streamer.metrics()
+        expect(metrics['failed_chunks'] == 1 and metrics['entities'] == 16,
+               'Loaded chunks have the wrong number of Entities.')
+        expect('Missing chunk file' in streamer.chunk_errors()[1, 1],
+               'The failed chunk\'s traceback was not kept.')
+        for _ in range(5):
+            streamer.update(32, 32)
+        expect(load_counts[1, 1] == 1,
+               'The failed chunk was requested again.')
+
+        streamer.update(64 * 10, 64 * 10)
+        expect(not streamer.is_resident(0, 0) and
+               not streamer.chunk_errors(),
+               'Distant chunks were not released.')
+    finally:
+        streamer.stop()
+
+
+def smoke_clones():
+    """Entities spawned from a template are bound like constructed
+    ones, and their Graphics share an image until they modify it.
+    """
+    prototype = Graphic(create_test_surface(16, 16))
+    prototype.opacify(-55)
+    template = EntityTemplate(prototype, Health(), Counter())
+    first, second = template.spawn_many([(0, 0), (20, 0)])
+    expect(first.graphic is not second.graphic and
+           first.counter is not second.counter,
+           'Spawned Entities share Components.')
+    expect(first.hp.entity is first and not hasattr(first, 'health'),
+           'The binding hook was not used when spawning.')
+    expect(first.graphic._image is second.graphic._image,
+           'Clones do not share their image.')
+
+    first.graphic.blit(Surface((4, 4)), (0, 0))
+    expect(first.graphic._image is not second.graphic._image,
+           'Modifying a clone did not copy its image.')
+    expect(first.graphic._get_alpha() == 200,
+           'Copying a clone\'s image lost its alpha.')
+    expect(second.graphic._get_alpha() == 200,
+           'Copying a clone\'s image changed the other clones.')
+
+
+SMOKE_TESTS = [smoke_entity_update, smoke_sharding, smoke_sharding_errors,
+               smoke_headless_mode, smoke_animation_blit,
+               smoke_component_index, smoke_collision_masks, smoke_snapshots,
+               smoke_rotation, smoke_streaming, smoke_clones]
+
+
+def main():
+    pygame.display.init()
+    # Surface.convert() requires a display mode to have been set.
+    pygame.display.set_mode((1, 1))
+
+    failures = 0
+    for smoke_test in SMOKE_TESTS:
+        try:
+            smoke_test()
+        except Exception:
+            failures += 1
+            print('FAIL %s' % smoke_test.__name__)
+            traceback.print_exc()
+        else:
+            print('ok   %s' % smoke_test.__name__)
+
+    pygame.quit()
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
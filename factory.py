@@ -0,0 +1,137 @@
+"""This module contains classes for defining the kinds of Entities in a
+game once, and then quickly creating as many of them as needed.
+"""
+from materials.game_objects import Component, Entity
+
+
+class EntityTemplate(object):
+    """A blueprint for creating Entities with the same set of
+    Components.
+
+    The template is built from a set of prototype Components, which are
+    constructed once. Each Entity spawned from the template receives
+    clones of the prototypes rather than newly-constructed Components,
+    so expensive set-up work, such as converting images when creating
+    Graphics, only happens once. Clones of Graphics share the
+    prototype's image until they modify it.
+
+    How each clone is bound to a new Entity is also worked out once,
+    when the template is created. Components that override neither
+    bind_to_entity() nor _add_self_as_attribute() are bound directly,
+    without any method calls.
+
+    Attributes:
+        entity_class (class): The class of Entity to create.
+            Its constructor must accept x and y-positions as its only
+            required arguments.
+        _prototypes (list of Component): The Components that are
+            cloned for each new Entity.
+        _direct_bindings (list): Contains an (index, attribute name)
+            tuple for each prototype that can be bound directly.
+        _custom_bindings (list of int): Contains the index of each
+            prototype whose clones must be bound by calling their
+            bind_to_entity(), since they customize how they are bound.
+    """
+    def __init__(self, *prototypes, **kwargs):
+        """Declare and initialize instance variables.
+
+        Args:
+            *prototypes: The Component objects that make up each
+                Entity. They must not be bound to an Entity, and should
+                not be used for anything else afterwards.
+            entity_class (class): A keyword argument specifying the
+                class of Entity to create.
+                The default value is Entity.
+        """
+        self.entity_class = kwargs.pop('entity_class', Entity)
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments: %s'
+                            % ', '.join(sorted(kwargs)))
+        for prototype in prototypes:
+            if prototype.entity is not None:
+                raise ValueError('Prototype Components must not be bound '
+                                 'to an Entity.')
+
+        self._prototypes = list(prototypes)
+        self._direct_bindings = []
+        self._custom_bindings = []
+        for index, prototype in enumerate(self._prototypes):
+            if _binds_directly(type(prototype)):
+                self._direct_bindings.append(
+                    (index, prototype._attribute_name()))
+            else:
+                self._custom_bindings.append(index)
+
+    def spawn(self, x, y):
+        """Create a new Entity from this template.
+
+        Args:
+            x (int): The x-position of the Entity relative to the
+                screen.
+            y (int): The y-position of the Entity relative to the
+                screen.
+        """
+        return self.spawn_many([(x, y)])[0]
+
+    def spawn_many(self, positions):
+        """Create a new Entity from this template at each of several
+        positions.
+
+        Args:
+            positions (list of tuple of int, int): Contains the x and
+                y-positions of each Entity to create.
+
+        Returns:
+            A list of the new Entities, in the same order as positions.
+        """
+        # Looking these up once keeps them out of the loop below.
+        entity_class = self.entity_class
+        prototypes = self._prototypes
+        direct_bindings = self._direct_bindings
+        custom_bindings = self._custom_bindings
+
+        entities = []
+        for x, y in positions:
+            entity = entity_class(x, y)
+            clones = [prototype.clone() for prototype in prototypes]
+            entity.components.extend(clones)
+            for index, attribute_name in direct_bindings:
+                clone = clones[index]
+                clone.entity = entity
+                entity.__dict__[attribute_name] = clone
+            for index in custom_bindings:
+                clones[index].bind_to_entity(entity)
+            # The Entity's constructor may have added it to an index
+            # before its Components were attached.
+            if entity._component_indexes:
+                entity._update_component_indexes()
+            entities.append(entity)
+        return entities
+
+
+def _binds_directly(component_class):
+    """Return a Boolean indicating whether a class of Component is bound
+    to Entities in the default way, in which case it can be added as an
+    attribute without calling any of its methods.
+
+    Args:
+        component_class (class): A subclass of Component.
+    """
+    return (component_class.bind_to_entity == Component.bind_to_entity and
+            component_class._add_self_as_attribute ==
+            Component._add_self_as_attribute)
+
+
+def spawn_many(template, positions):
+    """Create a new Entity from a template at each of several
+    positions.
+
+    Args:
+        template (EntityTemplate): Defines the Entities to create.
+        positions (list of tuple of int, int): Contains the x and
+            y-positions of each Entity to create.
+
+    Returns:
+        A list of the new Entities, in the same order as positions.
+    """
+    return template.spawn_many(positions)
@@ -22,6 +22,8 @@ class Entity(Sprite):
         y (int): The y-position of the Entity relative to the screen.
         components (list): Contains all of the Component objects that
             are contained in this Entity.
+        _component_indexes (list): Contains every ComponentIndex that
+            this Entity has been added to.
         * Note that components will also be added as unique attributes
           automatically. This will make it possible to access each
           component directly, rather than having to add .components.
@@ -41,6 +43,7 @@ class Entity(Sprite):
         self.x = x
         self.y = y
         self.components = []
+        self._component_indexes = []
         self.add_component(*components)
 
     def add_component(self, *components):
@@ -53,6 +56,40 @@ class Entity(Sprite):
         for component in components:
             self.components.append(component)
             component.bind_to_entity(self)
+        self._update_component_indexes()
+
+    def remove_component(self, *components):
+        """Unbind one or multiple components from this Entity.
+
+        Args:
+            *components: One or more Component objects that are
+                currently bound to this Entity.
+        """
+        for component in components:
+            self.components.remove(component)
+            component.unbind_from_entity(self)
+        self._update_component_indexes()
+
+    def component_indexes(self):
+        """Return a list of the ComponentIndex objects that contain this
+        Entity.
+        """
+        return list(self._component_indexes)
+
+    def kill(self):
+        """Remove this Entity from all Groups and ComponentIndexes that
+        contain it.
+        """
+        for index in list(self._component_indexes):
+            index.remove(self)
+        Sprite.kill(self)
+
+    def _update_component_indexes(self):
+        """Notify every ComponentIndex containing this Entity that its
+        set of components has changed.
+        """
+        for index in self._component_indexes:
+            index._refile(self)
 
     def move(self, dx=0, dy=0):
         """Move this Entity a set horizontal and/or vertical distance.
@@ -114,7 +151,9 @@ class Entity(Sprite):
         Args:
             component (Component): The Component to check.
         """
-        if getargspec(component.update)[1] is not None:
+        # The argument list of a bound method includes self, so a time
+        # parameter makes it longer than 1.
+        if len(getargspec(component.update).args) > 1:
             return True
         else:
             return False
@@ -164,10 +203,19 @@ class Component(object):
     which is why a default message Enum is not included with this
     library.
 
+    Components whose state changes during gameplay can have it saved
+    and restored by a WorldSnapshot. To support this, set state_size to
+    the number of ints the state needs, and override write_state() and
+    read_state().
+
     Attributes:
         entity (Entity): This Component is bound to it and has access
             to all of its members.
+        state_size (int): The number of ints that write_state() stores
+            in a snapshot buffer. This is a class attribute.
     """
+    state_size = 0
+
     def __init__(self, *args):
         """Declare and initialize instance variables.
 
@@ -187,6 +235,38 @@ class Component(object):
         self.entity = entity
         self._add_self_as_attribute(entity)
 
+    def clone(self):
+        """Return a new, unbound Component with the same state as this
+        one.
+
+        The copy is shallow, so any mutable attributes will be shared
+        with this Component. Subclasses that modify such attributes in
+        place should override this method and copy them.
+        """
+        # Copying the attribute dict directly is several times faster
+        # than copy.copy(), which goes through the pickling protocol.
+        component_copy = object.__new__(type(self))
+        component_copy.__dict__.update(self.__dict__)
+        component_copy.entity = None
+        return component_copy
+
+    def unbind_from_entity(self, entity):
+        """Unbind this Component from an Entity object.
+
+        Args:
+            entity (Entity): This component will no longer be bound to
+                it.
+        """
+        self._remove_self_as_attribute(entity)
+        if self.entity is entity:
+            self.entity = None
+
+    def _attribute_name(self):
+        """Return the name of the attribute that this Component will be
+        added to Entity objects under.
+        """
+        return type(self).__name__.lower()
+
     def _add_self_as_attribute(self, entity):
         """Add this Component as a new attribute in an Entity object.
 
@@ -197,8 +277,50 @@ class Component(object):
             entity (Entity): Will receive this Component as an
                 attribute.
         """
-        class_name = type(self).__name__
-        setattr(entity, class_name.lower(), self)
+        setattr(entity, self._attribute_name(), self)
+
+    def _remove_self_as_attribute(self, entity):
+        """Remove every attribute in an Entity object that refers to
+        this Component.
+
+        This undoes _add_self_as_attribute(), including any override of
+        it in a subclass. Attributes that have since been taken over by
+        another Component are left in place.
+
+        Args:
+            entity (Entity): Will have this Component removed from its
+                attributes.
+        """
+        for name, value in list(vars(entity).items()):
+            if value is self:
+                delattr(entity, name)
+
+    def write_state(self, buffer, offset):
+        """Store this Component's state within a snapshot buffer.
+
+        Subclasses with a state_size greater than 0 must override this
+        method.
+
+        Args:
+            buffer (array): Contains ints. Exactly state_size of them,
+                starting from offset, belong to this Component.
+            offset (int): The index of this Component's first int.
+        """
+        pass
+
+    def read_state(self, buffer, offset):
+        """Restore this Component's state from a snapshot buffer that
+        was filled by write_state().
+
+        Subclasses with a state_size greater than 0 must override this
+        method.
+
+        Args:
+            buffer (array): Contains ints. Exactly state_size of them,
+                starting from offset, belong to this Component.
+            offset (int): The index of this Component's first int.
+        """
+        pass
 
     def update(self, time):
         """Update the processes within this Component.
@@ -236,3 +358,162 @@ class Component(object):
                 the amount of damage, knockback, and hitstun.
         """
         raise NotImplementedError
+
+
+class ComponentIndex(object):
+    """A collection of Entities that can be searched by the types of
+    Components they contain.
+
+    Like a PyGame Group, Entities must be added to a ComponentIndex
+    explicitly. From then on, it keeps itself up to date as Components
+    are added to or removed from them.
+
+    Entities are filed by archetype: the set of Component classes they
+    contain, including any base classes. For example, an Entity with an
+    Animation belongs to both the Animation and Graphic types, so it
+    will be found by queries for either one. A query only has to check
+    each archetype rather than each Entity, and its results are cached
+    until an Entity matching the query is added, removed or changed.
+
+    Attributes:
+        _archetypes (dict): Maps each archetype, as a frozenset of
+            Component classes, to a set of the Entities that have it.
+        _entity_archetypes (dict): Maps each Entity to its archetype.
+        _query_cache (dict): Maps each queried frozenset of Component
+            classes to a tuple of the Entities that matched it.
+    """
+    def __init__(self, *entities):
+        """Declare and initialize instance variables.
+
+        Args:
+            *entities: Any Entity objects that will be added to the
+                index immediately.
+        """
+        self._archetypes = {}
+        self._entity_archetypes = {}
+        self._query_cache = {}
+        self.add(*entities)
+
+    def __contains__(self, entity):
+        return entity in self._entity_archetypes
+
+    def __len__(self):
+        return len(self._entity_archetypes)
+
+    def __iter__(self):
+        return iter(list(self._entity_archetypes))
+
+    def add(self, *entities):
+        """Add one or multiple Entities to this index.
+
+        Args:
+            *entities: One or more Entity objects. Entities that are
+                already in the index will be ignored.
+        """
+        for entity in entities:
+            if entity not in self._entity_archetypes:
+                entity._component_indexes.append(self)
+                self._file(entity, archetype_of(entity))
+
+    def remove(self, *entities):
+        """Remove one or multiple Entities from this index.
+
+        Args:
+            *entities: One or more Entity objects. Entities that are
+                not in the index will be ignored.
+        """
+        for entity in entities:
+            if entity in self._entity_archetypes:
+                entity._component_indexes.remove(self)
+                self._unfile(entity)
+
+    def query(self, *component_types):
+        """Return an iterator over every Entity that contains at least
+        one Component of each of the given types.
+
+        The Entities are iterated over from a snapshot of the index, so
+        it is safe to add or remove Components, or Entities, while
+        iterating.
+
+        Args:
+            *component_types: One or more Component classes. Subclasses
+                of these classes will also be matched.
+                If none are given, every Entity in the index will be
+                iterated over.
+        """
+        key = frozenset(component_types)
+        matches = self._query_cache.get(key)
+        if matches is None:
+            matches = tuple(entity
+                            for archetype, members in self._archetypes.items()
+                            if key <= archetype
+                            for entity in members)
+            self._query_cache[key] = matches
+        return iter(matches)
+
+    def count(self, *component_types):
+        """Return the number of Entities that contain at least one
+        Component of each of the given types.
+
+        Args:
+            *component_types: One or more Component classes.
+        """
+        self.query(*component_types)
+        return len(self._query_cache[frozenset(component_types)])
+
+    def _refile(self, entity):
+        """Move an Entity to the archetype matching its current
+        Components.
+        """
+        archetype = archetype_of(entity)
+        if archetype != self._entity_archetypes[entity]:
+            self._unfile(entity)
+            self._file(entity, archetype)
+
+    def _file(self, entity, archetype):
+        """Add an Entity to the members of an archetype."""
+        self._entity_archetypes[entity] = archetype
+        self._archetypes.setdefault(archetype, set()).add(entity)
+        self._invalidate_queries(archetype)
+
+    def _unfile(self, entity):
+        """Remove an Entity from the members of its archetype."""
+        archetype = self._entity_archetypes.pop(entity)
+        members = self._archetypes[archetype]
+        members.discard(entity)
+        if not members:
+            del self._archetypes[archetype]
+        self._invalidate_queries(archetype)
+
+    def _invalidate_queries(self, archetype):
+        """Discard the cached results of every query that an archetype
+        matches.
+        """
+        for key in list(self._query_cache):
+            if key <= archetype:
+                del self._query_cache[key]
+
+
+# Maps each Component class to the frozenset of Component classes it
+# counts as, so that the class hierarchy is only walked once per class.
+_component_types = {}
+
+
+def archetype_of(entity):
+    """Return a frozenset of every Component class that an Entity
+    contains, including their Component base classes.
+
+    Args:
+        entity (Entity): The Entity to check.
+    """
+    archetype = set()
+    for component in entity.components:
+        component_class = type(component)
+        types = _component_types.get(component_class)
+        if types is None:
+            types = frozenset(cls for cls in component_class.__mro__
+                              if issubclass(cls, Component) and
+                              cls is not Component)
+            _component_types[component_class] = types
+        archetype |= types
+    return frozenset(archetype)
@@ -1,6 +1,9 @@
 """This module contains classes for representing in-game images as they
 are drawn on-screen.
 """
+import math
+import weakref
+import pygame.mask
 import pygame.transform
 from enum import IntEnum
 from pygame.surface import Surface
@@ -9,6 +12,68 @@ from pygame.color import Color
 from game_objects import Component
 
 
+# When enabled, Graphics created afterwards will track only their
+# geometry and never allocate pixel data. See set_headless_mode().
+_headless_mode = False
+
+
+def set_headless_mode(enabled=True):
+    """Enable or disable headless mode for all Graphics and Animations
+    created afterwards.
+
+    Headless Graphics keep track of their position, dimensions, alpha
+    and animation frames exactly like regular ones, but never allocate
+    or transform any pixel data. Drawing them has no effect.
+    This is useful for running game logic on a server or within tests,
+    where nothing will ever be displayed.
+
+    Args:
+        enabled (Boolean): Specifies whether new Graphics will be
+            headless.
+            The default value is True.
+    """
+    global _headless_mode
+    _headless_mode = enabled
+
+
+# Stands in for a held frame of None within snapshot buffers, since
+# negative held frames are meaningful.
+_NO_HELD_FRAME = -2 ** 31
+
+# Collision masks are shared between all Graphics created from the same
+# source with the same flip state and dimensions. See
+# Graphic.collision_mask().
+# Sources are referenced weakly, so a source's masks are discarded once
+# the source itself is no longer in use.
+_mask_cache = weakref.WeakKeyDictionary()
+
+
+def clear_mask_cache():
+    """Discard every cached collision mask."""
+    _mask_cache.clear()
+
+
+# Rotated images are shared in the same way as collision masks. See
+# Graphic.set_rotation().
+_rotation_cache = weakref.WeakKeyDictionary()
+
+# The number of angles that a full turn is divided into, unless a
+# Graphic specifies otherwise.
+DEFAULT_ROTATION_BUCKETS = 36
+
+
+def clear_rotation_cache():
+    """Discard every cached rotated image."""
+    _rotation_cache.clear()
+
+
+def is_headless_mode():
+    """Return a Boolean indicating whether new Graphics will be
+    headless.
+    """
+    return _headless_mode
+
+
 def convert_to_colorkey_alpha(surf, colorkey=Color('magenta')):
     """Give the surface a colorkeyed background that will be
     transparent when drawing.
@@ -53,6 +118,10 @@ def order_flipped_sprite_sheet(flipped_sheet, frame_width):
         A new Surface containing the sprite sheet with the frames'
         content flipped, but arranged in their original order.
     """
+    # Headless sheets have no pixels, so their frames have no order.
+    if isinstance(flipped_sheet, HeadlessImage):
+        return flipped_sheet
+
     # To prevent alpha transparency issues, the source sheet will be
     # set to total opacity during the reordering the process.
     # Afterwards, the resulting sheet will be set to the original alpha
@@ -95,6 +164,127 @@ def create_blank_surface(width, height):
     return blank_surf
 
 
+def flip_image(image, flip_x, flip_y):
+    """Return a flipped copy of a Surface or HeadlessImage.
+
+    Args:
+        image (Surface): The image to flip. A HeadlessImage can be
+            passed instead.
+        flip_x (Boolean): Specifies whether to flip horizontally.
+        flip_y (Boolean): Specifies whether to flip vertically.
+    """
+    if isinstance(image, HeadlessImage):
+        return image.copy()
+    return pygame.transform.flip(image, flip_x, flip_y)
+
+
+def scale_image(image, size):
+    """Return a copy of a Surface or HeadlessImage stretched and/or
+    shrunk to new dimensions.
+
+    Args:
+        image (Surface): The image to scale. A HeadlessImage can be
+            passed instead.
+        size (tuple of int, int): The new width and height.
+    """
+    if isinstance(image, HeadlessImage):
+        scaled_image = HeadlessImage(size[0], size[1])
+        scaled_image.set_alpha(image.get_alpha())
+        return scaled_image
+    return pygame.transform.scale(image, size)
+
+
+def blit_all(destination, blit_sequence):
+    """Draw several images onto a Surface.
+
+    Surface.blits() is used when it is available, as it performs every
+    blit within a single call. Older versions of PyGame fall back to
+    calling Surface.blit() for each image.
+
+    Args:
+        destination (Surface): Will have the images drawn on it.
+        blit_sequence (list of tuple): Contains a (source, position,
+            area, special_flags) tuple for each image, in the same
+            format as the arguments of Surface.blit().
+    """
+    if hasattr(destination, 'blits'):
+        destination.blits(blit_sequence, 0)
+    else:
+        for blit_args in blit_sequence:
+            destination.blit(*blit_args)
+
+
+class HeadlessImage(object):
+    """A stand-in for a Surface that has dimensions and an alpha value,
+    but no pixel data.
+
+    Headless Graphics use it in place of their image. It can also be
+    passed as the source of a Graphic or Animation, so that server-side
+    code never has to load image files.
+
+    Attributes:
+        _width (int): The width of the image in pixels.
+        _height (int): The height of the image in pixels.
+        _alpha (int): The opacity of the image, from 0 to 255.
+    """
+    def __init__(self, width, height):
+        """Declare and initialize instance variables.
+
+        Args:
+            width (int): The width of the image in pixels.
+            height (int): The height of the image in pixels.
+        """
+        self._width = int(width)
+        self._height = int(height)
+        self._alpha = 255
+
+    def get_width(self):
+        return self._width
+
+    def get_height(self):
+        return self._height
+
+    def get_size(self):
+        return self._width, self._height
+
+    def get_rect(self):
+        return Rect(0, 0, self._width, self._height)
+
+    def get_alpha(self):
+        return self._alpha
+
+    def set_alpha(self, value):
+        """Set the opacity of the image.
+
+        Like Surface.set_alpha(), values outside of the range 0 to 255
+        are clamped to that range.
+
+        Args:
+            value (int): The new opacity value.
+        """
+        self._alpha = max(0, min(255, int(value)))
+
+    def copy(self):
+        """Return a new HeadlessImage with the same dimensions and
+        alpha.
+        """
+        image_copy = HeadlessImage(self._width, self._height)
+        image_copy._alpha = self._alpha
+        return image_copy
+
+    def blit(self, source, position, area=None, special_flags=0):
+        """Return the region of this image that source would cover if
+        it were drawn at position, without drawing anything.
+
+        The arguments are the same as those of Surface.blit().
+        """
+        if area is not None:
+            size = Rect(area).size
+        else:
+            size = source.get_size()
+        return Rect(position, size).clip(self.get_rect())
+
+
 class Axis(IntEnum):
     """Contains int representations of the possible 2D axes."""
     horizontal = 1
@@ -111,20 +301,45 @@ class Graphic(Component):
     Graphic's position is (2, 3), it will be drawn to (32, 33)
     on-screen.)
 
-    Several effects can also be applied to it, such as flipping the
-    image and adding or reducing transparency.
+    Several effects can also be applied to it, such as flipping or
+    rotating the image and adding or reducing transparency.
 
     Attributes:
         _image (Surface): Contains the Graphic's actual pixel data.
+            Headless Graphics hold a HeadlessImage instead.
         _rect (Rect): Contains the Graphic's x and y-offsets relative
             to its associated Entity, as well as its width and height.
+        _angle (float): The angle, in degrees, that the image is rotated
+            counterclockwise by. It is rounded to the nearest rotation
+            bucket when drawing.
+        _rotation_buckets (int): The number of evenly-spaced angles
+            that the image can be drawn at.
+        _shared_source (weakref): A weak reference to the source image
+            that the Graphic was created from, used to share collision
+            masks and rotated images with other Graphics. Once the
+            Graphic has been drawn onto, its pixels no longer match the
+            source, so this is set to None.
+        _image_flip (tuple of Boolean, Boolean): Specifies whether the
+            image is currently flipped horizontally and vertically
+            compared to the source.
+        _private_caches (dict): The collision masks and rotated images
+            belonging to this Graphic alone, used once _shared_source
+            is None.
+        _shares_image (Boolean): Specifies whether _image is shared
+            with clones of this Graphic, in which case it must be
+            copied before it is modified in place.
     """
+    # The x and y-offsets, the alpha value, and the angle in hundredths
+    # of a degree.
+    state_size = 4
+
     def __init__(self, source, x=0, y=0):
         """Declare and initialize instance variables.
 
         Args:
             source (Surface): Contains the 2D image associated with this
-                Graphic.
+                Graphic. Passing a HeadlessImage will create a headless
+                Graphic regardless of set_headless_mode().
             x (int): The x-offset of the Graphic's top-left corner
                 relative to its associated Entity.
                 The default value is 0.
@@ -133,8 +348,18 @@ class Graphic(Component):
                 The default value is 0.
         """
         super(Graphic, self).__init__()
-        self._image = convert_to_colorkey_alpha(source)
+        if _headless_mode or isinstance(source, HeadlessImage):
+            self._image = HeadlessImage(source.get_width(),
+                                        source.get_height())
+        else:
+            self._image = convert_to_colorkey_alpha(source)
         self._rect = Rect(x, y, source.get_width(), source.get_height())
+        self._angle = 0
+        self._rotation_buckets = DEFAULT_ROTATION_BUCKETS
+        self._shared_source = weakref.ref(source)
+        self._image_flip = (False, False)
+        self._private_caches = {}
+        self._shares_image = False
 
     def offset(self, dx=0, dy=0):
         """Move the Graphic away from its original position relative to
@@ -180,6 +405,59 @@ class Graphic(Component):
         if new_y is not None:
             self._rect.y = int(round(new_y))
 
+    def write_state(self, buffer, offset):
+        """Store the Graphic's position and alpha within a snapshot
+        buffer.
+
+        The image's dimensions and flip state are not stored, since
+        changing them requires re-rendering the pixels.
+
+        Args:
+            buffer (array): Contains ints. The Graphic's state will be
+                stored from offset onwards.
+            offset (int): The index of the Graphic's first int.
+        """
+        rect = self._rect
+        buffer[offset] = rect.x
+        buffer[offset + 1] = rect.y
+        # This is _get_alpha(), inlined since snapshots are saved often.
+        alpha = self._image.get_alpha()
+        buffer[offset + 2] = 255 if alpha is None else alpha
+        # The angle is never negative, so adding 0.5 rounds it.
+        buffer[offset + 3] = int(self._angle * 100 + 0.5)
+
+    def read_state(self, buffer, offset):
+        """Restore the Graphic's position and alpha from a snapshot
+        buffer.
+
+        Args:
+            buffer (array): Contains ints. The Graphic's state will be
+                read from offset onwards.
+            offset (int): The index of the Graphic's first int.
+        """
+        rect = self._rect
+        rect.x = buffer[offset]
+        rect.y = buffer[offset + 1]
+        alpha = buffer[offset + 2]
+        current_alpha = self._image.get_alpha()
+        # An alpha of None is drawn fully opaque, so it matches 255.
+        if alpha != current_alpha and (alpha != 255 or
+                                       current_alpha is not None):
+            self._own_image()
+            self._image.set_alpha(alpha)
+        self._angle = buffer[offset + 3] / 100.0
+
+    def _get_alpha(self):
+        """Return the opacity of the image, from 0 to 255.
+
+        Images returned by pygame.transform have no surface alpha, which
+        PyGame reports as None. These are drawn fully opaque.
+        """
+        alpha = self._image.get_alpha()
+        if alpha is None:
+            return 255
+        return alpha
+
     def get_width(self):
         return self._rect.width
 
@@ -241,8 +519,16 @@ class Graphic(Component):
     def draw_rect(self):
         """Return a Rect containing the actual position the Graphic
         will be drawn to, with the Entity's position taken into account.
+
+        If the Graphic is rotated, the Rect will enclose the whole
+        rotated image, centered on the same point as the unrotated one.
         """
-        return self._rect.move(self.entity.x, self.entity.y)
+        rect = self._rect.move(self.entity.x, self.entity.y)
+        if self._rotation_bucket() != 0:
+            center = rect.center
+            rect.size = self._rotated_size()
+            rect.center = center
+        return rect
 
     def flip(self, axis):
         """Flip the image horizontally and/or vertically.
@@ -253,10 +539,15 @@ class Graphic(Component):
                 To flip the image both ways, you can combine both values
                 using the | (bitwise or) operator.
         """
+        flipped_x, flipped_y = self._image_flip
         if (axis & Axis.horizontal) == Axis.horizontal:
-            self._image = pygame.transform.flip(self._image, True, False)
+            self._image = flip_image(self._image, True, False)
+            flipped_x = not flipped_x
         if (axis & Axis.vertical) == Axis.vertical:
-            self._image = pygame.transform.flip(self._image, False, True)
+            self._image = flip_image(self._image, False, True)
+            flipped_y = not flipped_y
+        self._image_flip = (flipped_x, flipped_y)
+        self._shares_image = False
 
     def magnify(self, zoom):
         """Enlarge or shrink the image using an equal scale for the
@@ -268,10 +559,11 @@ class Graphic(Component):
                 image's dimensions are 24x24 will enlarge the image to
                 48x48. Passing 0.5 will shrink it to 12x12.
         """
-        magnified_image = pygame.transform.scale(self._image,
+        magnified_image = scale_image(self._image,
             (int(round(self.get_width() * zoom)),
              int(round(self.get_height() * zoom))))
         self._image = magnified_image
+        self._shares_image = False
         self._update_rect_dimensions()
 
     def resize(self, new_width, new_height):
@@ -283,9 +575,10 @@ class Graphic(Component):
             new_height (int): The height that the image will shrink or
                 stretch to fit.
         """
-        resized_image = pygame.transform.scale(self._image,
+        resized_image = scale_image(self._image,
             (int(round(new_width)), int(round(new_height))))
         self._image = resized_image
+        self._shares_image = False
         self._update_rect_dimensions()
 
     def _update_rect_dimensions(self):
@@ -295,6 +588,91 @@ class Graphic(Component):
         self._rect.width = self._image.get_width()
         self._rect.height = self._image.get_height()
 
+    def rotate(self, angle):
+        """Rotate the image counterclockwise by an additional angle.
+
+        Args:
+            angle (float): The angle to rotate by, in degrees. Negative
+                values will rotate the image clockwise.
+        """
+        self.set_rotation(self._angle + angle)
+
+    def set_rotation(self, angle):
+        """Rotate the image counterclockwise to an exact angle.
+
+        The image will be drawn at the nearest of the Graphic's rotation
+        buckets. The rotated image for each bucket is only rendered the
+        first time it is needed, and is then shared with every other
+        Graphic created from the same source image with the same flip
+        state, dimensions and number of buckets.
+
+        Args:
+            angle (float): The angle of rotation, in degrees, relative
+                to the original image.
+        """
+        self._angle = angle % 360
+
+    def get_rotation(self):
+        """Return the angle, in degrees, that the image is currently
+        drawn at.
+        """
+        return self._bucket_angle(self._rotation_bucket())
+
+    def set_rotation_buckets(self, num_of_buckets):
+        """Set how many evenly-spaced angles the image can be drawn at.
+
+        More buckets make rotation smoother, at the cost of rendering
+        and storing more rotated images.
+
+        Args:
+            num_of_buckets (int): The number of angles that a full turn
+                is divided into. For example, passing 8 will draw the
+                image at multiples of 45 degrees.
+                It must be at least 1.
+        """
+        if num_of_buckets < 1:
+            raise ValueError('There must be at least 1 rotation bucket.')
+        self._rotation_buckets = num_of_buckets
+
+    def _rotation_bucket(self):
+        """Return the index of the rotation bucket nearest to the
+        current angle.
+        """
+        return (int(round(self._angle * self._rotation_buckets / 360.0)) %
+                self._rotation_buckets)
+
+    def _bucket_angle(self, bucket):
+        """Return the angle, in degrees, of a rotation bucket.
+
+        Args:
+            bucket (int): The index of the rotation bucket.
+        """
+        return bucket * 360.0 / self._rotation_buckets
+
+    def _rotated_size(self):
+        """Return a tuple containing the width and height of the
+        rotated image.
+        """
+        if not self.is_headless():
+            return self._rotated_frame().get_size()
+
+        # Headless Graphics have no rotated image to measure, so its
+        # size is calculated the same way as pygame.transform.rotate():
+        # exact for multiples of 90 degrees, and otherwise the corner
+        # extents truncated to whole pixels.
+        angle = self.get_rotation()
+        width = self.get_width()
+        height = self.get_height()
+        if angle % 90 == 0:
+            if angle % 180 == 0:
+                return width, height
+            return height, width
+        radians = math.radians(angle)
+        cosine = abs(math.cos(radians))
+        sine = abs(math.sin(radians))
+        return (int(width * cosine + height * sine),
+                int(width * sine + height * cosine))
+
     def opacify(self, amount):
         """Increase or decrease the image's transparency.
 
@@ -308,13 +686,14 @@ class Graphic(Component):
                 To make the image fully opaque, pass 255 or more. To
                 make the image fully transparent, pass -255 or less.
         """
-        self._image.set_alpha(self._image.get_alpha() + amount)
+        self._own_image()
+        self._image.set_alpha(self._get_alpha() + amount)
 
     def is_opaque(self):
         """Return a Boolean indicating whether the image is fully
         opaque.
         """
-        if self._image.get_alpha() >= 255:
+        if self._get_alpha() >= 255:
             return True
         else:
             return False
@@ -323,7 +702,7 @@ class Graphic(Component):
         """Return a Boolean indicating whether the image is fully
         transparent.
         """
-        if self._image.get_alpha() <= 0:
+        if self._get_alpha() <= 0:
             return True
         else:
             return False
@@ -352,11 +731,201 @@ class Graphic(Component):
         """
         x = position[0]
         y = position[1]
+        self._own_image()
+        self._detach_caches()
         return self._image.blit(source, (x, y), rect, special_flags)
 
+    def collision_mask(self):
+        """Return a Mask of the opaque pixels in the currently-displayed
+        image.
+
+        Masks are created from the colorkey the first time they are
+        needed, and are then shared with every other Graphic created
+        from the same source image with the same flip state, dimensions
+        and rotation.
+        Headless Graphics have no pixels, and return None.
+        """
+        if self.is_headless():
+            return None
+
+        masks = self._derived_cache(_mask_cache)
+        key = self._frame_key()
+        mask = masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(self._frame_image())
+            masks[key] = mask
+        return mask
+
+    def collides_with(self, other):
+        """Return a Boolean indicating whether any opaque pixels in this
+        Graphic overlap with those in another Graphic, as drawn
+        on-screen.
+
+        The pixels are only compared if the Graphics' draw Rects
+        overlap. Headless Graphics are compared using their draw Rects
+        alone.
+
+        Args:
+            other (Graphic): The Graphic to compare against.
+        """
+        own_rect = self.draw_rect()
+        other_rect = other.draw_rect()
+        if not own_rect.colliderect(other_rect):
+            return False
+        return self._masks_overlap(own_rect, other, other_rect)
+
+    def collide_all(self, others):
+        """Return a list of the Graphics whose opaque pixels overlap
+        with the ones in this Graphic, as drawn on-screen.
+
+        All of the draw Rects are compared in a single pass first, so
+        that pixels are only compared for the Graphics that are close
+        enough to collide.
+
+        Args:
+            others (list of Graphic): The Graphics to compare against.
+        """
+        own_rect = self.draw_rect()
+        other_rects = [other.draw_rect() for other in others]
+        return [others[index]
+                for index in own_rect.collidelistall(other_rects)
+                if self._masks_overlap(own_rect, others[index],
+                                       other_rects[index])]
+
+    def _masks_overlap(self, own_rect, other, other_rect):
+        """Return a Boolean indicating whether the collision masks of
+        this Graphic and another overlap, given their draw Rects.
+        """
+        own_mask = self.collision_mask()
+        other_mask = other.collision_mask()
+        if own_mask is None or other_mask is None:
+            return True
+        offset = (other_rect.x - own_rect.x, other_rect.y - own_rect.y)
+        return own_mask.overlap(other_mask, offset) is not None
+
+    def _frame_region(self):
+        """Return a Rect containing the area of the image that is
+        currently displayed.
+        """
+        return self._image.get_rect()
+
+    def _frame_key(self):
+        """Return a tuple identifying the currently-displayed frame and
+        rotation within the caches returned by _derived_cache().
+        """
+        bucket = self._rotation_bucket()
+        if bucket == 0:
+            return tuple(self._frame_region()) + (0, 0)
+        return tuple(self._frame_region()) + (self._rotation_buckets,
+                                              bucket)
+
+    def _frame_image(self):
+        """Return a Surface containing the currently-displayed frame,
+        rotated to the current angle.
+        """
+        rotated_frame = self._rotated_frame()
+        if rotated_frame is not None:
+            return rotated_frame
+        frame = self._image.subsurface(self._frame_region())
+        frame.set_colorkey(self._image.get_colorkey())
+        return frame
+
+    def _rotated_frame(self):
+        """Return a Surface containing the currently-displayed frame
+        rotated to the current angle, or None if it is not rotated.
+        """
+        bucket = self._rotation_bucket()
+        if bucket == 0:
+            return None
+
+        rotations = self._derived_cache(_rotation_cache)
+        key = self._frame_key()
+        rotated_frame = rotations.get(key)
+        if rotated_frame is None:
+            colorkey = self._image.get_colorkey()
+            frame = self._image.subsurface(self._frame_region())
+            frame.set_colorkey(colorkey)
+            rotated_frame = pygame.transform.rotate(
+                frame, self._bucket_angle(bucket))
+            rotated_frame.set_colorkey(colorkey)
+            rotations[key] = rotated_frame
+        return rotated_frame
+
+    def _derived_cache(self, shared_cache):
+        """Return the dict of cached data derived from the image in its
+        current state, such as collision masks or rotated images.
+
+        If the source image has since been freed, the data can no longer
+        be shared, so this Graphic's private caches are used instead.
+
+        Args:
+            shared_cache (WeakKeyDictionary): The module-level cache
+                that the data is shared through, such as _mask_cache.
+        """
+        key = self._image_flip + self._image.get_size()
+        source = None
+        if self._shared_source is not None:
+            source = self._shared_source()
+        if source is None:
+            return self._private_caches.setdefault(
+                (id(shared_cache),) + key, {})
+        source_cache = shared_cache.setdefault(source, {})
+        return source_cache.setdefault(key, {})
+
+    def _detach_caches(self):
+        """Stop sharing collision masks and rotated images with other
+        Graphics, as this Graphic's pixels are about to be changed.
+        """
+        self._shared_source = None
+        self._private_caches = {}
+
+    def is_headless(self):
+        """Return a Boolean indicating whether this Graphic only tracks
+        its geometry, without any pixel data.
+        """
+        return isinstance(self._image, HeadlessImage)
+
+    def clone(self):
+        """Return a new, unbound Graphic with the same state as this
+        one.
+
+        The clone shares this Graphic's image until either of them
+        modifies it in place, such as by blitting onto it or changing
+        its opacity, at which point the image is copied.
+        """
+        graphic_copy = super(Graphic, self).clone()
+        graphic_copy._rect = Rect(self._rect)
+        graphic_copy._shares_image = True
+        self._shares_image = True
+        return graphic_copy
+
+    def _own_image(self):
+        """Replace _image with a private copy if it is shared with any
+        clones, so that it can be modified in place.
+        """
+        if self._shares_image:
+            # Surface.copy() does not keep the surface alpha.
+            image_copy = self._image.copy()
+            image_copy.set_alpha(self._image.get_alpha())
+            self._image = image_copy
+            self._shares_image = False
+
+    def memory_size(self):
+        """Return the number of bytes used by this Graphic's pixel data.
+
+        Cached collision masks and rotated images are not included, as
+        they are shared with other Graphics. Headless Graphics return 0.
+        """
+        if self.is_headless():
+            return 0
+        return (self._image.get_bytesize() * self._image.get_width() *
+                self._image.get_height())
+
     def draw(self, destination):
         """Draw this Graphic's image onto a destination Surface.
 
+        Animations will only draw their current frame.
+
         Args:
             destination (Surface): Will have this Graphic drawn on it.
 
@@ -364,7 +933,17 @@ class Graphic(Component):
             A Rect containing the region of the destination that was
             drawn onto.
         """
-        return destination.blit(self._image, self.draw_rect())
+        if self.is_headless():
+            return self.draw_rect().clip(destination.get_rect())
+
+        rotated_frame = self._rotated_frame()
+        if rotated_frame is not None:
+            # Rotated images are shared, so they take on the alpha of
+            # whichever Graphic is drawing them.
+            rotated_frame.set_alpha(self._image.get_alpha())
+            return destination.blit(rotated_frame, self.draw_rect())
+        return destination.blit(self._image, self.draw_rect(),
+                                self._frame_region())
 
 
 class Animation(Graphic):
@@ -397,6 +976,10 @@ class Animation(Graphic):
             (If backwards playback is enabled, this will be the 'first'
              frame in the sprite sheet.)
     """
+    # The Graphic's state, followed by the frame index, frame counter,
+    # paused and backwards playback flags, and held frame.
+    state_size = Graphic.state_size + 5
+
     def __init__(self, source, x=0, y=0, *frame_durations):
         """Declare and initialize instance variables.
 
@@ -420,18 +1003,71 @@ class Animation(Graphic):
         self._is_paused = False
         self._held_frame = None
 
-    def _add_self_as_attribute(self, entity):
-        """Add this Animation as a new attribute in an Entity object.
+    def write_state(self, buffer, offset):
+        """Store the Animation's position, alpha and playback state
+        within a snapshot buffer.
 
-        Note that this will overwrite an existing Graphic or Animation
-        already bound to the specified Entity.
+        Args:
+            buffer (array): Contains ints. The Animation's state will be
+                stored from offset onwards.
+            offset (int): The index of the Animation's first int.
+        """
+        # The Graphic's state is written here rather than by calling
+        # the super method, since snapshots are saved often.
+        rect = self._rect
+        buffer[offset] = rect.x
+        buffer[offset + 1] = rect.y
+        alpha = self._image.get_alpha()
+        buffer[offset + 2] = 255 if alpha is None else alpha
+        # The angle is never negative, so adding 0.5 rounds it.
+        buffer[offset + 3] = int(self._angle * 100 + 0.5)
+        buffer[offset + 4] = self._frame_index
+        buffer[offset + 5] = self._frame_counter
+        buffer[offset + 6] = self._is_paused
+        buffer[offset + 7] = self._is_playing_backwards
+        held_frame = self._held_frame
+        buffer[offset + 8] = (_NO_HELD_FRAME if held_frame is None
+                              else held_frame)
+
+    def read_state(self, buffer, offset):
+        """Restore the Animation's position, alpha and playback state
+        from a snapshot buffer.
 
         Args:
-            entity (Entity): Will receive this Animation as an
-                attribute.
+            buffer (array): Contains ints. The Animation's state will be
+                read from offset onwards.
+            offset (int): The index of the Animation's first int.
+        """
+        # The Graphic's state is read here rather than by calling the
+        # super method, since snapshots are restored often.
+        rect = self._rect
+        rect.x = buffer[offset]
+        rect.y = buffer[offset + 1]
+        alpha = buffer[offset + 2]
+        current_alpha = self._image.get_alpha()
+        # An alpha of None is drawn fully opaque, so it matches 255.
+        if alpha != current_alpha and (alpha != 255 or
+                                       current_alpha is not None):
+            self._own_image()
+            self._image.set_alpha(alpha)
+        self._angle = buffer[offset + 3] / 100.0
+        self._frame_index = buffer[offset + 4]
+        self._frame_counter = buffer[offset + 5]
+        self._is_paused = buffer[offset + 6] != 0
+        self._is_playing_backwards = buffer[offset + 7] != 0
+        held_frame = buffer[offset + 8]
+        self._held_frame = (None if held_frame == _NO_HELD_FRAME
+                            else held_frame)
+
+    def _attribute_name(self):
+        """Return the name of the attribute that this Animation will be
+        added to Entity objects under.
+
+        Note that this will overwrite an existing Graphic or Animation
+        already bound to the specified Entity.
         """
         super_name = self.__class__.__bases__[0].__name__
-        setattr(entity, super_name.lower(), self)
+        return super_name.lower()
 
     def _calculate_frame_width(self):
         """Return the width, in pixels, of a single frame in this
@@ -469,11 +1105,12 @@ class Animation(Graphic):
                 image's dimensions are 24x24 will enlarge the image to
                 48x48. Passing 0.5 will shrink it to 12x12.
         """
-        magnified_image = pygame.transform.scale(self._image,
+        magnified_image = scale_image(self._image,
             # The width of the entire sprite sheet must be magnified.
             (int(round(self.get_width() * zoom * self.num_of_frames())),
              int(round(self.get_height() * zoom))))
         self._image = magnified_image
+        self._shares_image = False
         self._update_rect_dimensions()
 
     def resize(self, new_width, new_height):
@@ -544,14 +1181,20 @@ class Animation(Graphic):
         return Rect(self._frame_index * self.get_width(), 0,
                     self.get_width(), self.get_height())
 
+    def _frame_region(self):
+        """Return a Rect containing the area of the sprite sheet that is
+        currently displayed.
+        """
+        return self.current_frame_region()
+
     def blit(self, source, position, rect=None, special_flags=0):
-        """Draw a Surface on top of this Animation.
+        """Draw a Surface on top of every frame in this Animation.
 
         Args:
             source (Surface): The image that will be drawn onto this
                 Animation.
             position (tuple of int, int): Contains the x and y-positions
-                of the source image relative to this Graphic.
+                of the source image relative to each frame.
             area (Rect): An optional parameter specifying the region of
                 the source image that will be used.
                 Leave this parameter blank to draw the entire source
@@ -563,43 +1206,34 @@ class Animation(Graphic):
                 flags when blitting.
 
         Returns:
-            A Rect containing the region of this Animation that was drawn
+            A Rect containing the region of each frame that was drawn
             onto.
         """
-        position = list(position)
-
-        # The source image needs to be drawn on all frames.
-        for frame_index in reversed(xrange(self.num_of_frames())):
-            # The x-value of the position needs to be shifted over
-            # to the frame that will be modified.
-            position[0] += frame_index * self.get_width()
-
-            # Since the first frame in the sprite sheet doesn't shift
-            # the x-position, its blit Rect will be used as this
-            # function's return Rect.
-            # This will terminate the function, so the frames are iterated
-            # in reverse order to ensure that the first frame is the last to
-            # to be blitted to.
-            if frame_index == 0:
-                return super(Animation, self).blit(source, tuple(position),
-                                                   rect, special_flags)
-            else:
-                super(Animation, self).blit(source, tuple(position),
-                                            rect, special_flags)
-
-    def draw(self, destination):
-        """Draw this Animation's current frame onto a destination
-        Surface.
-
-        Args:
-            destination (Surface): Will have this Animation drawn on it.
-
-        Returns:
-            A Rect containing the region of the destination that was
-            drawn onto.
-        """
-        return destination.blit(self._image, self.draw_rect(),
-                                self.current_frame_region())
+        # The source image is clipped to the bounds of a single frame,
+        # so that it never spills over into the neighbouring frames.
+        if rect is None:
+            rect = source.get_rect()
+        else:
+            rect = Rect(rect)
+        frame_rect = Rect(0, 0, self.get_width(), self.get_height())
+        drawn_region = Rect(position, rect.size).clip(frame_rect)
+        if self.is_headless() or drawn_region.width == 0 or \
+                drawn_region.height == 0:
+            return drawn_region
+        clipped_area = Rect(rect.x + drawn_region.x - position[0],
+                            rect.y + drawn_region.y - position[1],
+                            drawn_region.width, drawn_region.height)
+
+        # The same region is drawn onto every frame in a single batch.
+        self._own_image()
+        self._detach_caches()
+        blit_sequence = [(source,
+                          (frame_index * self.get_width() + drawn_region.x,
+                           drawn_region.y),
+                          clipped_area, special_flags)
+                         for frame_index in range(self.num_of_frames())]
+        blit_all(self._image, blit_sequence)
+        return drawn_region
 
     def update(self):
         """Update this Animation's processes.
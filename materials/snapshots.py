@@ -0,0 +1,138 @@
+"""This module contains classes for saving and restoring the state of
+many Entities at once, such as for rollback networking or replays.
+"""
+from array import array
+from itertools import izip
+
+
+class WorldSnapshot(object):
+    """Saves and restores the state of a fixed set of Entities using
+    compact buffers of ints.
+
+    Each Entity's position is stored, followed by the state of every
+    Component it contains with a state_size greater than 0. (See
+    Component.write_state().) The position of every value within a
+    buffer is worked out once, when the WorldSnapshot is created, so
+    saving and restoring only have to copy ints.
+
+    Since the layout depends on the Entities and their Components, a
+    new WorldSnapshot should be created whenever Entities or Components
+    are added or removed. Buffers created by one WorldSnapshot cannot be
+    used with another.
+
+    Attributes:
+        size (int): The number of ints within each buffer.
+        _entity_offsets (list): Contains an (Entity, offset) tuple for
+            each Entity, where offset is the index of its position
+            within a buffer.
+        _component_writers (list): Contains a (write_state, offset)
+            tuple for each Component that has state, where write_state
+            is the Component's bound write_state() method and offset is
+            the index of its first int within a buffer.
+        _component_readers (list): The same as _component_writers,
+            but with each Component's bound read_state() method.
+    """
+    def __init__(self, entities):
+        """Declare and initialize instance variables.
+
+        Args:
+            entities (list of Entity): The Entities whose state will be
+                saved and restored.
+        """
+        self._entity_offsets = []
+        self._component_writers = []
+        self._component_readers = []
+        offset = 0
+        for entity in entities:
+            self._entity_offsets.append((entity, offset))
+            offset += 2
+            for component in entity.components:
+                if component.state_size > 0:
+                    # Binding the methods here saves looking them up on
+                    # every save and restore.
+                    self._component_writers.append((component.write_state,
+                                                    offset))
+                    self._component_readers.append((component.read_state,
+                                                    offset))
+                    offset += component.state_size
+        self.size = offset
+
+    def create_buffer(self):
+        """Return a new buffer that can hold the state of every Entity.
+
+        Buffers should be created ahead of time and reused, so that
+        saving does not need to allocate any memory.
+        """
+        return array('i', [0]) * self.size
+
+    def save(self, buffer=None):
+        """Store the current state of every Entity within a buffer.
+
+        Args:
+            buffer (array): A buffer returned by create_buffer(), which
+                will be overwritten.
+                If omitted, a new buffer will be created.
+
+        Returns:
+            The buffer containing the saved state.
+        """
+        if buffer is None:
+            buffer = self.create_buffer()
+        for entity, offset in self._entity_offsets:
+            buffer[offset] = entity.x
+            buffer[offset + 1] = entity.y
+        for write_state, offset in self._component_writers:
+            write_state(buffer, offset)
+        return buffer
+
+    def restore(self, buffer):
+        """Return every Entity to the state stored within a buffer.
+
+        The Entities and Components are modified in place.
+
+        Args:
+            buffer (array): A buffer filled by save().
+        """
+        for entity, offset in self._entity_offsets:
+            entity.x = buffer[offset]
+            entity.y = buffer[offset + 1]
+        for read_state, offset in self._component_readers:
+            read_state(buffer, offset)
+
+    def diff(self, base, target):
+        """Return the changes needed to turn one buffer into another.
+
+        Most values rarely change between consecutive frames, so a diff
+        is usually much smaller than a full buffer.
+
+        Args:
+            base (array): The buffer to compare from.
+            target (array): The buffer to compare to.
+
+        Returns:
+            A tuple of two arrays, containing the index and new value
+            of every int that differs between the buffers.
+        """
+        indices = array('i')
+        values = array('i')
+        for index in xrange(self.size):
+            if base[index] != target[index]:
+                indices.append(index)
+                values.append(target[index])
+        return indices, values
+
+    def apply_diff(self, buffer, diff):
+        """Modify a buffer in place using the changes returned by
+        diff().
+
+        Applying diff(base, target) to a copy of base will make it equal
+        to target.
+
+        Args:
+            buffer (array): The buffer to modify.
+            diff (tuple of array, array): The changes returned by
+                diff().
+        """
+        indices, values = diff
+        for index, value in izip(indices, values):
+            buffer[index] = value
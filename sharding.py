@@ -0,0 +1,796 @@
+"""This module contains classes for simulating many independent groups
+of Entities, such as rooms or matches, across several processes.
+
+Each group of Entities is called a room. Rooms are spread across a pool
+of worker processes, or shards, which step every Entity at a fixed tick
+rate. Entity positions and messages travel between the main process
+and the shards through shared memory, so the per-tick traffic never has
+to be pickled.
+"""
+import time
+import traceback
+from multiprocessing import Pipe, Process, Lock, Queue, cpu_count
+from multiprocessing.sharedctypes import RawArray
+from Queue import Empty
+
+
+# Every message occupies a fixed-width record of ints in shared memory:
+# room key, Entity index, message type, detail count, then the details.
+MAX_MESSAGE_DETAILS = 4
+_MESSAGE_WIDTH = 4 + MAX_MESSAGE_DETAILS
+
+# Each room's region of a shard's snapshot buffer begins with a header
+# containing the room's Entity count and its last tick cost.
+_ROOM_HEADER_SIZE = 2
+
+# Passed as the Entity index in a message to broadcast it to every
+# Entity in the room.
+_ALL_ENTITIES = -1
+
+
+class ShardedWorld(object):
+    """A collection of rooms that are simulated in parallel across
+    several worker processes.
+
+    Each room is created inside its shard by calling a room factory: a
+    function taking no arguments that returns a list of Entities.
+    Because the factory is sent to another process, it must be
+    picklable, which means it should be defined at the top level of a
+    module. Any Graphics created by the factory are created in the
+    worker process, so they should not require a display.
+
+    Rooms can be moved to a different shard by rebalance(). A moved
+    room is re-created from its factory, after which every Entity is
+    returned to its previous position. Any other state held by the
+    room's Components is reset, so factories should build rooms that
+    can be resumed from their positions alone.
+
+    If a room raises an error while it is being updated or receiving a
+    message, it stops being simulated, but its shard carries on with
+    its other rooms. The error can be retrieved with room_errors().
+
+    Attributes:
+        num_of_shards (int): The number of worker processes.
+        tick_rate (int): How many times per second each shard updates
+            its rooms.
+        _shards (list of _Shard): The handles to each worker process.
+        _rooms (dict): Maps each room ID to the _RoomRecord describing
+            where it is simulated.
+        _next_room_key (int): The integer key given to the next room
+            added. Keys identify rooms within shared memory.
+    """
+    def __init__(self, num_of_shards=None, tick_rate=60,
+                 entity_capacity=65536, message_capacity=1024):
+        """Declare and initialize instance variables.
+
+        Args:
+            num_of_shards (int): The number of worker processes to
+                simulate rooms in.
+                The default value is the number of CPU cores.
+            tick_rate (int): How many times per second each shard
+                updates its rooms.
+                The default value is 60.
+            entity_capacity (int): The maximum number of Entities that
+                each shard can hold at once.
+                The default value is 65536.
+            message_capacity (int): The maximum number of messages that
+                can wait to be delivered to each shard.
+                The default value is 1024.
+        """
+        if num_of_shards is None:
+            num_of_shards = cpu_count()
+        self.num_of_shards = num_of_shards
+        self.tick_rate = tick_rate
+        self._shards = [_Shard(entity_capacity, message_capacity)
+                        for _ in range(num_of_shards)]
+        self._rooms = {}
+        self._next_room_key = 0
+
+    def start(self):
+        """Launch all of the worker processes."""
+        for shard in self._shards:
+            shard.start(self.tick_rate)
+
+    def stop(self):
+        """Stop all of the worker processes and wait for them to exit.
+        """
+        for shard in self._shards:
+            shard.stop()
+
+    def add_room(self, room_id, room_factory, max_entities):
+        """Create a new room on the least busy shard.
+
+        Args:
+            room_id: A unique, hashable value used to refer to the room.
+            room_factory (function): Takes no arguments and returns a
+                list of the Entities within the room.
+            max_entities (int): The maximum number of Entities the room
+                will ever contain. Only this many Entities will have
+                their positions shared with the main process.
+        """
+        if room_id in self._rooms:
+            raise ValueError('A room with the ID %r already exists.'
+                             % (room_id,))
+        shard_index = self._least_busy_shard()
+        record = _RoomRecord(self._next_room_key, room_factory,
+                             max_entities)
+        self._next_room_key += 1
+        self._place_room(record, shard_index)
+        self._rooms[room_id] = record
+
+    def remove_room(self, room_id):
+        """Stop simulating a room and discard its Entities.
+
+        Args:
+            room_id: The ID that the room was added with.
+
+        Returns:
+            A list of (x, y) tuples containing the final position of
+            each Entity in the room.
+        """
+        record = self._rooms[room_id]
+        positions = self._take_room(record)
+        # The record is only discarded once the shard has let go of the
+        # room, so that a failed removal can be retried.
+        del self._rooms[room_id]
+        return positions
+
+    def room_ids(self, shard_index=None):
+        """Return a list of the IDs of every room being simulated.
+
+        Args:
+            shard_index (int): If specified, only the rooms on this
+                shard will be returned.
+        """
+        return [room_id for room_id, record in self._rooms.items()
+                if shard_index is None or record.shard_index == shard_index]
+
+    def room_positions(self, room_id):
+        """Return a list of (x, y) tuples containing the position of
+        each Entity in a room as of the last completed tick.
+
+        Args:
+            room_id: The ID that the room was added with.
+        """
+        record = self._rooms[room_id]
+        return self._shards[record.shard_index].read_positions(record)
+
+    def send_message(self, room_id, entity_index, message_type, *details):
+        """Broadcast data to all Components within an Entity in a room.
+
+        The message is delivered at the start of the shard's next tick.
+
+        Args:
+            room_id: The ID that the room was added with.
+            entity_index (int): The index of the Entity within the list
+                returned by the room factory. Pass None to send the
+                message to every Entity in the room.
+            message_type (IntEnum): One of the values from an IntEnum
+                class. Only int-based message types can be sent through
+                shared memory.
+            details: Up to MAX_MESSAGE_DETAILS ints that will be passed
+                to each Component's receive_message().
+        """
+        if len(details) > MAX_MESSAGE_DETAILS:
+            raise ValueError('Messages can contain at most %d details.'
+                             % MAX_MESSAGE_DETAILS)
+        if entity_index is None:
+            entity_index = _ALL_ENTITIES
+        record = self._rooms[room_id]
+        self._shards[record.shard_index].messages.put(
+            [record.key, entity_index, int(message_type), len(details)] +
+            [int(detail) for detail in details])
+
+    def room_errors(self):
+        """Return a dict mapping the ID of every room that stopped
+        because of an error to the traceback of that error, as a
+        string.
+
+        Failed rooms keep their last positions until they are removed.
+        """
+        for shard in self._shards:
+            for key, error in shard.read_errors():
+                for record in self._rooms.values():
+                    if record.key == key:
+                        record.error = error
+        return dict((room_id, record.error)
+                    for room_id, record in self._rooms.items()
+                    if record.error is not None)
+
+    def shard_is_alive(self, shard_index):
+        """Return a Boolean indicating whether a shard's worker process
+        is running.
+
+        Args:
+            shard_index (int): The index of the shard to check.
+        """
+        return self._shards[shard_index].is_alive()
+
+    def tick_latency(self, shard_index):
+        """Return a tuple containing the duration, in seconds, of the
+        shard's last tick and a running average of its tick durations.
+
+        If the shard's worker process has exited, the values from its
+        final tick are returned. See shard_is_alive().
+
+        Args:
+            shard_index (int): The index of the shard to check.
+        """
+        return self._shards[shard_index].read_latency()
+
+    def tick_latencies(self):
+        """Return a list containing the tick latency of every shard.
+        See tick_latency() for details.
+        """
+        return [shard.read_latency() for shard in self._shards]
+
+    def rebalance(self, tolerance=0.1, max_moves=4):
+        """Move rooms from the busiest shards to the least busy ones
+        until their workloads are roughly even.
+
+        The workload of each room is measured from how long it took to
+        update during the last tick.
+
+        Args:
+            tolerance (float): The fraction of the busiest shard's
+                workload by which shards may differ before a room is
+                moved.
+                The default value is 0.1.
+            max_moves (int): The maximum number of rooms to move during
+                this call, as each move briefly pauses both shards.
+                The default value is 4.
+
+        Messages that were sent to a room but not yet delivered when it
+        is moved will be lost.
+
+        Returns:
+            The number of rooms that were moved.
+        """
+        # Moved rooms report no cost until their new shard has updated
+        # them, so the costs are read once and tracked here instead.
+        loads = [0.0] * self.num_of_shards
+        for record in self._rooms.values():
+            shard = self._shards[record.shard_index]
+            record.cost = shard.read_room_cost(record)
+            loads[record.shard_index] += record.cost
+
+        moves = 0
+        while moves < max_moves:
+            busiest = max(range(self.num_of_shards), key=loads.__getitem__)
+            idlest = min(range(self.num_of_shards), key=loads.__getitem__)
+            difference = loads[busiest] - loads[idlest]
+            if difference <= loads[busiest] * tolerance:
+                break
+
+            # Moving the room whose cost is nearest to half of the
+            # difference brings the two shards closest to even.
+            candidates = [(abs(record.cost - difference / 2.0), room_id)
+                          for room_id, record in self._rooms.items()
+                          if record.shard_index == busiest and
+                          0 < record.cost < difference]
+            if not candidates:
+                break
+            room_id = min(candidates)[1]
+
+            record = self._rooms[room_id]
+            positions = self._take_room(record)
+            self._place_room(record, idlest, positions)
+            loads[busiest] -= record.cost
+            loads[idlest] += record.cost
+            moves += 1
+        return moves
+
+    def _place_room(self, record, shard_index, positions=None):
+        """Create a room within a shard.
+
+        Args:
+            record (_RoomRecord): Describes the room to create.
+            shard_index (int): The index of the shard to create it in.
+            positions (list of tuple of int, int): If specified, each
+                Entity will be moved to these positions after being
+                created.
+        """
+        shard = self._shards[shard_index]
+        record.offset = shard.allocate(record.region_size())
+        record.shard_index = shard_index
+        record.error = None
+        shard.write_header(record)
+        try:
+            shard.add_room(record, positions)
+        except Exception:
+            shard.free(record.offset, record.region_size())
+            raise
+
+    def _take_room(self, record):
+        """Remove a room from its shard and return the final positions
+        of its Entities.
+        """
+        shard = self._shards[record.shard_index]
+        positions = shard.remove_room(record)
+        shard.free(record.offset, record.region_size())
+        return positions
+
+    def _room_costs(self, shard_index):
+        """Return a list of (room ID, cost) tuples for every room in a
+        shard, where cost is the room's last tick duration in seconds.
+        """
+        shard = self._shards[shard_index]
+        return [(room_id, shard.read_room_cost(record))
+                for room_id, record in self._rooms.items()
+                if record.shard_index == shard_index]
+
+    def _shard_loads(self):
+        """Return a list containing the sum of the room costs on each
+        shard.
+        """
+        return [sum(cost for _, cost in self._room_costs(index))
+                for index in range(self.num_of_shards)]
+
+    def _least_busy_shard(self):
+        """Return the index of the shard with the lowest workload.
+        Ties are broken by the number of rooms on each shard.
+        """
+        loads = self._shard_loads()
+        room_counts = [len(self.room_ids(index))
+                       for index in range(self.num_of_shards)]
+        return min(range(self.num_of_shards),
+                   key=lambda index: (loads[index], room_counts[index]))
+
+
+class _RoomRecord(object):
+    """The main process's bookkeeping for a single room.
+
+    Attributes:
+        key (int): Identifies the room within shared memory.
+        factory (function): Creates the room's Entities.
+        max_entities (int): The maximum number of Entities whose
+            positions are shared.
+        shard_index (int): The index of the shard simulating the room.
+        offset (int): The position of the room's region within its
+            shard's snapshot buffer.
+        cost (float): The duration, in seconds, of the room's last
+            update, as of the last time it was checked.
+        error (str): The traceback of the error that stopped the room,
+            or None if it is still running.
+    """
+    def __init__(self, key, factory, max_entities):
+        """Declare and initialize instance variables.
+
+        Args:
+            key (int): Identifies the room within shared memory.
+            factory (function): Creates the room's Entities.
+            max_entities (int): The maximum number of Entities whose
+                positions are shared.
+        """
+        self.key = key
+        self.factory = factory
+        self.max_entities = max_entities
+        self.shard_index = None
+        self.offset = None
+        self.cost = 0.0
+        self.error = None
+
+    def region_size(self):
+        """Return the number of ints the room occupies within a shard's
+        snapshot buffer.
+        """
+        return _ROOM_HEADER_SIZE + self.max_entities * 2
+
+
+class _Shard(object):
+    """The main process's handle to a single worker process, along with
+    the shared memory used to communicate with it.
+
+    Attributes:
+        snapshot (RawArray): Contains each room's header followed by
+            the x and y-positions of its Entities.
+        latency (RawArray): Contains the duration of the last tick, a
+            running average of tick durations, and the number of ticks
+            completed.
+        lock (Lock): Guards snapshot and latency while they are being
+            written or read.
+        messages (_SharedMessageQueue): Messages waiting to be
+            delivered to the shard's rooms.
+        errors (Queue): Receives a (room key, traceback) tuple from the
+            worker process for each room that fails.
+        _free_regions (list): Contains (offset, size) tuples for each
+            unused region of the snapshot buffer.
+        _process (Process): The worker process.
+        _connection (Connection): Sends commands to the worker process.
+    """
+    def __init__(self, entity_capacity, message_capacity):
+        """Declare and initialize instance variables.
+
+        Args:
+            entity_capacity (int): The maximum number of Entities that
+                the shard can hold at once.
+            message_capacity (int): The maximum number of messages that
+                can wait to be delivered.
+        """
+        snapshot_size = entity_capacity * (2 + _ROOM_HEADER_SIZE)
+        self.snapshot = RawArray('i', snapshot_size)
+        self.latency = RawArray('d', 3)
+        self.lock = Lock()
+        self.messages = _SharedMessageQueue(message_capacity)
+        self.errors = Queue()
+        self._free_regions = [(0, snapshot_size)]
+        self._process = None
+        self._connection = None
+
+    def start(self, tick_rate):
+        """Launch the worker process.
+
+        Args:
+            tick_rate (int): How many times per second the worker
+                updates its rooms.
+        """
+        self._connection, worker_connection = Pipe()
+        self._process = Process(target=_run_shard,
+                                args=(worker_connection, self.snapshot,
+                                      self.latency, self.lock,
+                                      self.messages, self.errors,
+                                      tick_rate))
+        self._process.daemon = True
+        self._process.start()
+
+    def stop(self):
+        """Stop the worker process and wait for it to exit."""
+        if self._process is not None:
+            try:
+                self._connection.send(('stop',))
+            except IOError:
+                # The worker has already exited, such as after an error
+                # within a room.
+                pass
+            self._process.join()
+            self._process = None
+
+    def is_alive(self):
+        """Return a Boolean indicating whether the worker process is
+        running.
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def add_room(self, record, positions=None):
+        """Create a room within the worker process.
+
+        Args:
+            record (_RoomRecord): Describes the room to create.
+            positions (list of tuple of int, int): If specified, each
+                Entity will be moved to these positions after being
+                created.
+        """
+        error = self._request('add', record.key, record.factory,
+                              record.offset, record.max_entities,
+                              positions)
+        if error is not None:
+            raise RuntimeError('Room %d could not be created: %s'
+                               % (record.key, error))
+
+    def write_header(self, record):
+        """Initialize a room's header within the snapshot buffer, until
+        the worker process writes the first one.
+
+        The region may still hold the header of a room that used to
+        occupy it, so the Entity count is cleared and the cost is set to
+        the room's last known cost.
+
+        Args:
+            record (_RoomRecord): Describes the room.
+        """
+        with self.lock:
+            self.snapshot[record.offset] = 0
+            self.snapshot[record.offset + 1] = int(record.cost * 1000000)
+
+    def remove_room(self, record):
+        """Discard a room from the worker process and return the final
+        positions of its Entities.
+        """
+        return self._request('remove', record.key)
+
+    def read_errors(self):
+        """Return a list of (room key, traceback) tuples for every room
+        that has failed since the last call.
+        """
+        errors = []
+        while True:
+            try:
+                errors.append(self.errors.get_nowait())
+            except Empty:
+                return errors
+
+    def _request(self, *command):
+        """Send a command to the worker process and return its reply.
+
+        Raises:
+            RuntimeError: The worker process has exited.
+        """
+        try:
+            self._connection.send(command)
+            return self._connection.recv()
+        except (IOError, EOFError):
+            raise RuntimeError('The shard\'s worker process has exited.')
+
+    def allocate(self, size):
+        """Reserve a region of the snapshot buffer and return its
+        offset.
+
+        Args:
+            size (int): The number of ints to reserve.
+        """
+        for index, (offset, free_size) in enumerate(self._free_regions):
+            if free_size >= size:
+                if free_size == size:
+                    del self._free_regions[index]
+                else:
+                    self._free_regions[index] = (offset + size,
+                                                 free_size - size)
+                return offset
+        raise ValueError('The shard does not have enough capacity for '
+                         'another %d ints.' % size)
+
+    def free(self, offset, size):
+        """Return a region of the snapshot buffer so that it can be
+        reserved again.
+
+        Args:
+            offset (int): The start of the region.
+            size (int): The number of ints in the region.
+        """
+        regions = sorted(self._free_regions + [(offset, size)])
+        merged = [regions[0]]
+        for region_offset, region_size in regions[1:]:
+            last_offset, last_size = merged[-1]
+            if last_offset + last_size == region_offset:
+                merged[-1] = (last_offset, last_size + region_size)
+            else:
+                merged.append((region_offset, region_size))
+        self._free_regions = merged
+
+    def read_positions(self, record):
+        """Return a list of (x, y) tuples for each Entity in a room."""
+        with self.lock:
+            num_of_entities = min(self.snapshot[record.offset],
+                                  record.max_entities)
+            start = record.offset + _ROOM_HEADER_SIZE
+            values = self.snapshot[start:start + num_of_entities * 2]
+        return list(zip(values[0::2], values[1::2]))
+
+    def read_room_cost(self, record):
+        """Return the duration, in seconds, of a room's last update."""
+        with self.lock:
+            microseconds = self.snapshot[record.offset + 1]
+        return microseconds / 1000000.0
+
+    def read_latency(self):
+        """Return a tuple containing the duration of the last tick and
+        a running average of tick durations, both in seconds.
+        """
+        with self.lock:
+            return self.latency[0], self.latency[1]
+
+
+class _SharedMessageQueue(object):
+    """A fixed-capacity ring buffer of int records in shared memory.
+
+    Attributes:
+        _records (RawArray): Stores the records back-to-back.
+        _state (RawArray): Contains the index of the oldest record and
+            the number of records waiting.
+        _lock (Lock): Guards the buffer while it is being accessed.
+        _capacity (int): The maximum number of records waiting at once.
+    """
+    def __init__(self, capacity):
+        """Declare and initialize instance variables.
+
+        Args:
+            capacity (int): The maximum number of records waiting at
+                once.
+        """
+        self._records = RawArray('i', capacity * _MESSAGE_WIDTH)
+        self._state = RawArray('i', 2)
+        self._lock = Lock()
+        self._capacity = capacity
+
+    def put(self, record):
+        """Add a record to the end of the queue.
+
+        Args:
+            record (list of int): Contains at most _MESSAGE_WIDTH ints.
+        """
+        with self._lock:
+            head, count = self._state[0], self._state[1]
+            if count >= self._capacity:
+                raise IndexError('The message queue is full.')
+            start = ((head + count) % self._capacity) * _MESSAGE_WIDTH
+            self._records[start:start + len(record)] = record
+            self._state[1] = count + 1
+
+    def drain(self):
+        """Remove every waiting record from the queue and return them as
+        a list of lists of ints.
+        """
+        with self._lock:
+            head, count = self._state[0], self._state[1]
+            records = []
+            for index in range(head, head + count):
+                start = (index % self._capacity) * _MESSAGE_WIDTH
+                records.append(self._records[start:start + _MESSAGE_WIDTH])
+            self._state[0] = (head + count) % self._capacity
+            self._state[1] = 0
+        return records
+
+
+class _ShardRoom(object):
+    """A room as it exists within a worker process.
+
+    Attributes:
+        entities (list of Entity): The Entities in the room.
+        offset (int): The position of the room's region within the
+            shard's snapshot buffer.
+        max_entities (int): The maximum number of Entities whose
+            positions are shared.
+        cost (int): The duration, in microseconds, of the room's last
+            update.
+        error (str): The traceback of the error that stopped the room,
+            or None if it is still running.
+    """
+    def __init__(self, entities, offset, max_entities):
+        """Declare and initialize instance variables.
+
+        Args:
+            entities (list of Entity): The Entities in the room.
+            offset (int): The position of the room's region within the
+                shard's snapshot buffer.
+            max_entities (int): The maximum number of Entities whose
+                positions are shared.
+        """
+        self.entities = entities
+        self.offset = offset
+        self.max_entities = max_entities
+        self.cost = 0
+        self.error = None
+
+    def fail(self, key, errors):
+        """Stop the room because of the error currently being handled,
+        and report it to the main process.
+
+        Args:
+            key (int): Identifies the room within shared memory.
+            errors (Queue): Receives the room key and traceback.
+        """
+        self.error = traceback.format_exc()
+        # A stopped room has no workload worth moving to another shard.
+        self.cost = 0
+        errors.put((key, self.error))
+
+    def update(self, time_step):
+        """Update every Entity in the room and record how long it took.
+
+        Args:
+            time_step (float): The duration of a tick, in seconds.
+        """
+        start = time.time()
+        for entity in self.entities:
+            entity.update(time_step)
+        self.cost = int((time.time() - start) * 1000000)
+
+    def deliver(self, entity_index, message_type, details):
+        """Pass a message on to one or all of the room's Entities."""
+        if entity_index == _ALL_ENTITIES:
+            for entity in self.entities:
+                entity.send_message(message_type, *details)
+        elif 0 <= entity_index < len(self.entities):
+            self.entities[entity_index].send_message(message_type,
+                                                     *details)
+
+    def positions(self):
+        """Return a list of (x, y) tuples for each Entity."""
+        return [(int(entity.x), int(entity.y)) for entity in self.entities]
+
+    def snapshot_values(self):
+        """Return the room's header and positions as a flat list of
+        ints, ready to be copied into the snapshot buffer.
+        """
+        shared_entities = self.entities[:self.max_entities]
+        values = [len(shared_entities), self.cost]
+        for entity in shared_entities:
+            values.append(int(entity.x))
+            values.append(int(entity.y))
+        return values
+
+
+def _run_shard(connection, snapshot, latency, lock, messages, errors,
+               tick_rate):
+    """Simulate rooms at a fixed tick rate until told to stop.
+
+    This is the entry point of each worker process.
+
+    Args:
+        connection (Connection): Receives commands from the main
+            process.
+        snapshot (RawArray): Receives each room's header and positions
+            after every tick.
+        latency (RawArray): Receives the shard's tick durations.
+        lock (Lock): Guards snapshot and latency.
+        messages (_SharedMessageQueue): Messages waiting to be
+            delivered to the shard's rooms.
+        errors (Queue): Receives a (room key, traceback) tuple for each
+            room that fails.
+        tick_rate (int): How many times per second to update the rooms.
+    """
+    # Errors that the main process never reads must not stop the worker
+    # from exiting.
+    errors.cancel_join_thread()
+    rooms = {}
+    time_step = 1.0 / tick_rate
+    next_tick = time.time()
+
+    while True:
+        while connection.poll():
+            command = connection.recv()
+            if command[0] == 'stop':
+                return
+            elif command[0] == 'add':
+                connection.send(_add_shard_room(rooms, *command[1:]))
+            elif command[0] == 'remove':
+                room = rooms.pop(command[1])
+                connection.send(room.positions())
+
+        for record in messages.drain():
+            room = rooms.get(record[0])
+            if room is not None and room.error is None:
+                details = tuple(record[4:4 + record[3]])
+                try:
+                    room.deliver(record[1], record[2], details)
+                except Exception:
+                    room.fail(record[0], errors)
+
+        tick_start = time.time()
+        for key, room in rooms.items():
+            if room.error is None:
+                try:
+                    room.update(time_step)
+                except Exception:
+                    room.fail(key, errors)
+        tick_duration = time.time() - tick_start
+
+        with lock:
+            for room in rooms.values():
+                values = room.snapshot_values()
+                snapshot[room.offset:room.offset + len(values)] = values
+            # The running average weights recent ticks more heavily so
+            # that it follows changes in workload.
+            if latency[2] == 0:
+                latency[1] = tick_duration
+            else:
+                latency[1] = latency[1] * 0.9 + tick_duration * 0.1
+            latency[0] = tick_duration
+            latency[2] += 1
+
+        next_tick += time_step
+        delay = next_tick - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Skip the missed ticks rather than rushing to catch up.
+            next_tick = time.time()
+
+
+def _add_shard_room(rooms, key, factory, offset, max_entities, positions):
+    """Create a room within a worker process.
+
+    Returns:
+        None if the room was created successfully, or a string
+        describing the error that occurred otherwise.
+    """
+    try:
+        entities = list(factory())
+    except Exception as error:
+        return repr(error)
+
+    if positions is not None:
+        for entity, (x, y) in zip(entities, positions):
+            entity.set_position(x, y)
+    rooms[key] = _ShardRoom(entities, offset, max_entities)
+    return None
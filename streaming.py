@@ -0,0 +1,362 @@
+"""This module contains classes for streaming a large world in and out
+of memory, one square region at a time, as the camera moves around it.
+
+The world is divided into a grid of square chunks. Chunks near the
+camera are loaded on background threads, where their data can be read
+and their images decoded without stalling the game. The Entities for
+each loaded chunk are then created on the main thread, within a time
+budget for each frame. Once the camera moves far enough away, a
+chunk's Entities are released so that they and their images can be
+freed from memory.
+"""
+import threading
+import time
+import traceback
+from Queue import Queue, Empty
+
+
+class ChunkStreamer(object):
+    """Loads and releases the chunks of a world around the camera.
+
+    Chunks are identified by their (column, row) coordinates in the
+    grid. A chunk will start loading once it is within load_radius
+    chunks of the camera's chunk, and will only be released once it is
+    more than unload_radius chunks away. Keeping unload_radius larger
+    than load_radius prevents chunks from being repeatedly loaded and
+    released as the camera moves back and forth across a boundary.
+
+    Two functions define the contents of each chunk:
+        load_chunk(column, row) is called on a background thread, and
+            returns a list of items describing the chunk's contents.
+            This is where files should be read and images should be
+            loaded with pygame.image.load(), as these are the slowest
+            steps.
+        create_entity(item) is called on the main thread for each item,
+            and returns the Entity it describes, or None if it does not
+            describe an Entity. This is where Graphics should be
+            created, since converting images requires the display.
+
+    If load_chunk() raises an error, the chunk is marked as failed and
+    left empty, rather than being requested again on every update. It
+    will be retried once it has been released and the camera comes
+    back. The errors can be retrieved with chunk_errors().
+
+    Attributes:
+        chunk_size (int): The width and height of each chunk, in pixels.
+        load_radius (int): The distance, in chunks, from the camera
+            within which chunks are loaded.
+        unload_radius (int): The distance, in chunks, from the camera
+            beyond which chunks are released.
+        time_budget (float): The maximum time, in seconds, to spend
+            creating Entities during each call to update().
+        _load_chunk (function): Returns the items within a chunk.
+        _create_entity (function): Creates an Entity from an item.
+        _chunks (dict): Maps the coordinates of every chunk that is
+            loading or loaded to its _Chunk.
+        _requests (Queue): Chunks waiting to be loaded by the
+            background threads.
+        _results (Queue): Chunks that the background threads have
+            finished loading.
+        _integrating (list of _Chunk): Loaded chunks whose Entities
+            are still being created, in order of arrival.
+        _threads (list of Thread): The background loading threads.
+        _last_integration_time (float): The time spent creating
+            Entities during the last call to update().
+    """
+    def __init__(self, chunk_size, load_chunk, create_entity,
+                 load_radius=1, unload_radius=2, time_budget=0.002,
+                 num_of_threads=1):
+        """Declare and initialize instance variables.
+
+        Args:
+            chunk_size (int): The width and height of each chunk, in
+                pixels.
+            load_chunk (function): Takes the column and row of a chunk,
+                and returns a list of the items within it. It will be
+                called on a background thread.
+            create_entity (function): Takes one of the items returned by
+                load_chunk(), and returns an Entity or None. It will be
+                called on the main thread.
+            load_radius (int): The distance, in chunks, from the camera
+                within which chunks are loaded.
+                The default value is 1.
+            unload_radius (int): The distance, in chunks, from the
+                camera beyond which chunks are released. It must be at
+                least as large as load_radius.
+                The default value is 2.
+            time_budget (float): The maximum time, in seconds, to spend
+                creating Entities during each call to update().
+                The default value is 0.002.
+            num_of_threads (int): The number of background threads that
+                chunks are loaded on.
+                The default value is 1.
+        """
+        if unload_radius < load_radius:
+            raise ValueError('unload_radius must be at least as large as '
+                             'load_radius.')
+        self.chunk_size = chunk_size
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius
+        self.time_budget = time_budget
+        self._load_chunk = load_chunk
+        self._create_entity = create_entity
+        self._chunks = {}
+        self._requests = Queue()
+        self._results = Queue()
+        self._integrating = []
+        self._last_integration_time = 0.0
+        self._threads = []
+        for _ in range(num_of_threads):
+            thread = threading.Thread(target=self._run_loader)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the background threads and wait for them to exit.
+
+        Chunks that are already loaded will remain loaded.
+        """
+        for _ in self._threads:
+            self._requests.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def update(self, camera_x, camera_y):
+        """Load and release chunks around the camera, and create
+        Entities for loaded chunks until the time budget runs out.
+
+        This method should be called once every update cycle.
+
+        Args:
+            camera_x (int): The x-position of the camera's center.
+            camera_y (int): The y-position of the camera's center.
+        """
+        camera_chunk = self.chunk_at(camera_x, camera_y)
+        self._release_distant_chunks(camera_chunk)
+        self._request_nearby_chunks(camera_chunk)
+        self._integrate_loaded_chunks()
+
+    def chunk_at(self, x, y):
+        """Return a tuple containing the column and row of the chunk
+        that contains a position.
+
+        Args:
+            x (int): The x-position to check.
+            y (int): The y-position to check.
+        """
+        return int(x // self.chunk_size), int(y // self.chunk_size)
+
+    def is_resident(self, column, row):
+        """Return a Boolean indicating whether all of the Entities in a
+        chunk have been created.
+
+        Args:
+            column (int): The column of the chunk.
+            row (int): The row of the chunk.
+        """
+        chunk = self._chunks.get((column, row))
+        return chunk is not None and chunk.state == _Chunk.resident
+
+    def entities(self):
+        """Return a list of the Entities that have been created for
+        every loaded chunk.
+        """
+        return [entity for chunk in self._chunks.values()
+                for entity in chunk.entities]
+
+    def chunk_errors(self):
+        """Return a dict mapping the coordinates of every failed chunk
+        to the traceback of the error raised while loading it, as a
+        string.
+        """
+        return dict((coordinates, chunk.error)
+                    for coordinates, chunk in self._chunks.items()
+                    if chunk.state == _Chunk.failed)
+
+    def metrics(self):
+        """Return a dict describing the current state of the world.
+
+        It contains the following keys:
+            resident_chunks: The number of chunks with all of their
+                Entities created.
+            integrating_chunks: The number of loaded chunks that are
+                still having their Entities created.
+            loading_chunks: The number of chunks still being loaded in
+                the background.
+            failed_chunks: The number of chunks that could not be
+                loaded. See chunk_errors().
+            entities: The number of Entities that have been created.
+            image_bytes: The memory used by the pixel data of every
+                Graphic within those Entities.
+            integration_time: The time spent creating Entities during
+                the last call to update(), in seconds.
+        """
+        states = [chunk.state for chunk in self._chunks.values()]
+        entities = self.entities()
+        return {
+            'resident_chunks': states.count(_Chunk.resident),
+            'integrating_chunks': states.count(_Chunk.integrating),
+            'loading_chunks': states.count(_Chunk.loading),
+            'failed_chunks': states.count(_Chunk.failed),
+            'entities': len(entities),
+            'image_bytes': sum(component.memory_size()
+                               for entity in entities
+                               for component in entity.components
+                               if hasattr(component, 'memory_size')),
+            'integration_time': self._last_integration_time,
+        }
+
+    def _distance(self, coordinates, camera_chunk):
+        """Return the distance, in chunks, between a chunk and the
+        camera's chunk. Diagonal steps count as a distance of 1.
+        """
+        return max(abs(coordinates[0] - camera_chunk[0]),
+                   abs(coordinates[1] - camera_chunk[1]))
+
+    def _request_nearby_chunks(self, camera_chunk):
+        """Queue every chunk within load_radius of the camera that is
+        not already loading or loaded, nearest chunks first.
+        """
+        nearby = []
+        for column in range(camera_chunk[0] - self.load_radius,
+                            camera_chunk[0] + self.load_radius + 1):
+            for row in range(camera_chunk[1] - self.load_radius,
+                             camera_chunk[1] + self.load_radius + 1):
+                if (column, row) not in self._chunks:
+                    nearby.append((column, row))
+        nearby.sort(key=lambda coordinates:
+                    self._distance(coordinates, camera_chunk))
+
+        for coordinates in nearby:
+            chunk = _Chunk(coordinates)
+            self._chunks[coordinates] = chunk
+            self._requests.put(chunk)
+
+    def _release_distant_chunks(self, camera_chunk):
+        """Release every chunk further than unload_radius from the
+        camera.
+
+        Entities that have moved into a chunk that is staying loaded
+        are handed over to that chunk instead of being released.
+        """
+        distant = [chunk for coordinates, chunk in self._chunks.items()
+                   if self._distance(coordinates, camera_chunk) >
+                   self.unload_radius]
+        for chunk in distant:
+            del self._chunks[chunk.coordinates]
+        for chunk in distant:
+            # Chunks still being loaded will be ignored when they
+            # arrive.
+            chunk.cancelled = True
+            if chunk in self._integrating:
+                self._integrating.remove(chunk)
+            for entity in chunk.entities:
+                new_chunk = self._chunks.get(self.chunk_at(entity.x,
+                                                           entity.y))
+                if new_chunk is not None:
+                    new_chunk.entities.append(entity)
+                else:
+                    entity.kill()
+            chunk.entities = []
+            chunk.items = []
+
+    def _integrate_loaded_chunks(self):
+        """Create Entities for loaded chunks, in the order they
+        arrived, until the time budget runs out.
+        """
+        start_time = time.time()
+        while time.time() - start_time < self.time_budget:
+            if not self._integrating and not self._receive_loaded_chunk():
+                break
+
+            chunk = self._integrating[0]
+            entity = self._create_entity(chunk.items[chunk.next_item])
+            if entity is not None:
+                chunk.entities.append(entity)
+            chunk.next_item += 1
+
+            if chunk.next_item >= len(chunk.items):
+                chunk.items = []
+                chunk.state = _Chunk.resident
+                self._integrating.pop(0)
+        self._last_integration_time = time.time() - start_time
+
+    def _receive_loaded_chunk(self):
+        """Move the next chunk finished by the background threads onto
+        the list of chunks to integrate.
+
+        Returns:
+            A Boolean indicating whether a chunk was moved. If no
+            chunks have finished loading, False is returned.
+        """
+        while True:
+            try:
+                chunk = self._results.get_nowait()
+            except Empty:
+                return False
+            if chunk.cancelled:
+                continue
+            if chunk.error is not None:
+                chunk.state = _Chunk.failed
+            elif chunk.items:
+                chunk.state = _Chunk.integrating
+                self._integrating.append(chunk)
+                return True
+            else:
+                chunk.state = _Chunk.resident
+
+    def _run_loader(self):
+        """Load requested chunks until a None request is received.
+
+        This is the entry point of each background thread.
+        """
+        while True:
+            chunk = self._requests.get()
+            if chunk is None:
+                return
+            if chunk.cancelled:
+                continue
+            try:
+                chunk.items = list(self._load_chunk(*chunk.coordinates))
+            except Exception:
+                chunk.error = traceback.format_exc()
+            self._results.put(chunk)
+
+
+class _Chunk(object):
+    """A single square region of the world, as tracked by a
+    ChunkStreamer.
+
+    Attributes:
+        coordinates (tuple of int, int): The column and row of the chunk.
+        state (str): One of loading, integrating, resident or failed.
+        items (list): The items returned by load_chunk().
+        next_item (int): The index of the next item to create an Entity
+            for.
+        entities (list of Entity): The Entities created so far.
+        cancelled (Boolean): Specifies whether the chunk was released
+            while it was still loading.
+        error (str): The traceback of the error raised by load_chunk(),
+            if any.
+    """
+    loading = 'loading'
+    integrating = 'integrating'
+    resident = 'resident'
+    failed = 'failed'
+
+    def __init__(self, coordinates):
+        """Declare and initialize instance variables.
+
+        Args:
+            coordinates (tuple of int, int): The column and row of the
+                chunk.
+        """
+        self.coordinates = coordinates
+        self.state = _Chunk.loading
+        self.items = []
+        self.next_item = 0
+        self.entities = []
+        self.cancelled = False
+        self.error = None